@@ -1,36 +1,208 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+import os
+
+if __name__ == '__main__' and not os.environ.get('FLASK_DEV'):
+    # Patch stdlib sockets/threads before anything else imports them so
+    # request handlers yield to other greenlets while waiting on I/O
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, Response, g, render_template, request, jsonify, send_from_directory
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
-import json
+from whitenoise import WhiteNoise
+import diskcache
+import functools
+import threading
+from collections import deque
+import orjson
+import hashlib
 import uuid
 import time
-from datetime import datetime
-import os
 
-from simulation_generator import SimulationGenerator
+from simulation_generator import SimulationGenerator, DIFFICULTY_LEVELS, VITAL_FIELDS, VITAL_PATHS
 from patient_generator import PatientGenerator
 from assessment_engine import AssessmentEngine
 from database_manager import DatabaseManager
+from caching import LRUCache, now_iso
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson"""
+    
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # orjson already produces UTF-8, so skip the str decode/encode round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.option), mimetype="application/json")
+
+def _compressed_body_key(request):
+    """Cache key set by set_cache_headers for content-addressed (ETagged) responses"""
+    return g.get('compressed_body_key')
 
 app = Flask(__name__, 
            template_folder='../frontend/templates', 
            static_folder='../frontend/static')
+app.json = OrjsonProvider(app)
+# Simulation summaries repeat the same keys for every step and compress well
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_MIN_SIZE'] = 512
+app.config['COMPRESS_LEVEL'] = 5
+app.config['COMPRESS_CACHE_BACKEND'] = LRUCache
+app.config['COMPRESS_CACHE_KEY'] = _compressed_body_key
 CORS(app)
+Compress(app)
+# Serve /static/ from WhiteNoise's in-memory index instead of Flask's view
+app.wsgi_app = WhiteNoise(app.wsgi_app, root=app.static_folder, prefix='static/', max_age=31536000)
 
 # Initialize components
-simulation_gen = SimulationGenerator()
-patient_gen = PatientGenerator()
-assessment_engine = AssessmentEngine()
-db_manager = DatabaseManager()
+@functools.lru_cache(maxsize=1)
+def _simulation_gen():
+    """Build the simulation generator on first use in each worker"""
+    return SimulationGenerator()
+
+@functools.lru_cache(maxsize=1)
+def _patient_gen():
+    """Build the patient generator on first use in each worker"""
+    return PatientGenerator()
+
+@functools.lru_cache(maxsize=1)
+def _assessment_engine():
+    """Build the assessment engine on first use in each worker"""
+    return AssessmentEngine()
+
+db_manager = DatabaseManager(os.environ.get('SIMULATION_DB_PATH', 'surgical_simulations.db'))
+
+# Simulation reads (keyed by simulation ID) are shared by every worker process
+# through an on-disk cache; handlers that write to a simulation must call
+# _invalidate_simulation()
+simulation_cache = diskcache.Cache(os.environ.get('SIMULATION_CACHE_DIR', '.sim_cache'))
+SIMULATION_CACHE_TTL = 3600
+
+def _generation_key(simulation_id):
+    """Cache key counting the writes to a simulation, bumped on every invalidation"""
+    return ('generation', simulation_id)
+
+def _get_simulation(simulation_id):
+    """Get simulation data, reading through the simulation cache"""
+    simulation_data = simulation_cache.get(simulation_id)
+    if simulation_data is None:
+        # A write that lands between this database read and the cache fill
+        # bumps the generation, and the stale read is then not cached
+        generation = simulation_cache.get(_generation_key(simulation_id), 0)
+        simulation_data = db_manager.get_simulation(simulation_id)
+        if simulation_data:
+            with simulation_cache.transact():
+                if simulation_cache.get(_generation_key(simulation_id), 0) == generation:
+                    simulation_cache.set(simulation_id, simulation_data, expire=SIMULATION_CACHE_TTL)
+    return simulation_data
+
+def _invalidate_simulation(simulation_id):
+    """Drop a cached simulation after it has been written to"""
+    key = _generation_key(simulation_id)
+    with simulation_cache.transact():
+        simulation_cache.incr(key)
+        # Expires like the entries it guards, so counters do not pile up on disk
+        simulation_cache.touch(key, expire=SIMULATION_CACHE_TTL)
+        simulation_cache.delete(simulation_id)
+
+# Simulation IDs are cut from one large urandom read instead of one read each
+UUID_BATCH_SIZE = 1024
+_uuid_buffer = deque()
+_uuid_lock = threading.Lock()
+_uuid_pid = os.getpid()
+
+def _new_simulation_id():
+    """Return a random (version 4) UUID as 32 hex characters"""
+    global _uuid_pid
+    with _uuid_lock:
+        # A forked worker must not hand out the IDs its parent buffered
+        if _uuid_pid != os.getpid():
+            _uuid_buffer.clear()
+            _uuid_pid = os.getpid()
+        if not _uuid_buffer:
+            raw = os.urandom(16 * UUID_BATCH_SIZE)
+            for i in range(0, len(raw), 16):
+                _uuid_buffer.append(uuid.UUID(bytes=raw[i:i + 16], version=4).hex)
+        return _uuid_buffer.popleft()
+
+def _request_data():
+    """Decode the request body as MessagePack or JSON based on its content type"""
+    if request.mimetype == 'application/msgpack':
+        import msgpack
+        return msgpack.unpackb(request.get_data(cache=False), raw=False)
+    return request.get_json(cache=True)
+
+PROCEDURES = [
+    {
+        "id": "laparoscopic_cholecystectomy",
+        "name": "Laparoscopic Cholecystectomy",
+        "category": "General Surgery",
+        "difficulty": ["beginner", "intermediate", "advanced"],
+        "duration": "45-90 minutes"
+    },
+    {
+        "id": "appendectomy",
+        "name": "Appendectomy",
+        "category": "General Surgery", 
+        "difficulty": ["beginner", "intermediate"],
+        "duration": "30-60 minutes"
+    },
+    {
+        "id": "knee_arthroscopy",
+        "name": "Knee Arthroscopy",
+        "category": "Orthopedic",
+        "difficulty": ["intermediate", "advanced"],
+        "duration": "60-120 minutes"
+    }
+]
+
+# The catalog never changes at runtime, so serialize it and derive its ETag once
+_PROCEDURES_JSON = orjson.dumps(PROCEDURES)
+_PROCEDURES_ETAG = hashlib.md5(_PROCEDURES_JSON).hexdigest()
+
+# Cache-Control per endpoint; anything not listed is left to the client's defaults
+CACHE_POLICIES = {
+    'get_procedures': 'public, max-age=86400',
+    'get_patient_vitals': 'no-store',
+    'health_check': 'no-store',
+    'metrics': 'no-store',
+}
+
+@app.after_request
+def set_cache_headers(response):
+    """Let browsers and CDNs answer repeat GETs without reaching a worker"""
+    if request.method != 'GET' or response.status_code not in (200, 304):
+        return response
+    if request.endpoint == 'get_simulation_data':
+        # Completed simulations never change again; in-progress ones are
+        # revalidated against an ETag of the body on every load. Both hold
+        # patient records, so only the user's own browser may store them
+        if g.get('simulation_status') == 'completed':
+            response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        response.add_etag()
+        response.make_conditional(request)
+        # The ETag hashes the body, so its compressed form can be reused until it changes
+        g.compressed_body_key = (response.get_etag()[0], request.headers.get('Accept-Encoding', ''))
+    elif request.endpoint in CACHE_POLICIES:
+        response.headers['Cache-Control'] = CACHE_POLICIES[request.endpoint]
+    return response
 
 @app.route('/')
 def index():
     """Main dashboard page"""
     return render_template('index.html')
 
-@app.route('/test-static')
-def test_static():
-    """Test static file serving"""
-    return f"""
+# Static assets are only deployed with the code, so check for them once
+_STATIC_HTML = f"""
     <h1>Static File Test</h1>
     <p>Static folder: {app.static_folder}</p>
     <p>Template folder: {app.template_folder}</p>
@@ -40,6 +212,11 @@ def test_static():
     <p>Dashboard JS exists: {os.path.exists(os.path.join(app.static_folder, 'js', 'dashboard.js'))}</p>
     """
 
+@app.route('/test-static')
+def test_static():
+    """Test static file serving"""
+    return _STATIC_HTML
+
 @app.route('/simulation')
 def simulation_page():
     """Simulation interface page"""
@@ -49,46 +226,34 @@ def simulation_page():
 @app.route('/api/procedures', methods=['GET'])
 def get_procedures():
     """Get available surgical procedures"""
-    procedures = [
-        {
-            "id": "laparoscopic_cholecystectomy",
-            "name": "Laparoscopic Cholecystectomy",
-            "category": "General Surgery",
-            "difficulty": ["beginner", "intermediate", "advanced"],
-            "duration": "45-90 minutes"
-        },
-        {
-            "id": "appendectomy",
-            "name": "Appendectomy",
-            "category": "General Surgery", 
-            "difficulty": ["beginner", "intermediate"],
-            "duration": "30-60 minutes"
-        },
-        {
-            "id": "knee_arthroscopy",
-            "name": "Knee Arthroscopy",
-            "category": "Orthopedic",
-            "difficulty": ["intermediate", "advanced"],
-            "duration": "60-120 minutes"
-        }
-    ]
-    return jsonify(procedures)
+    if request.if_none_match.contains(_PROCEDURES_ETAG):
+        response = Response(status=304)
+    else:
+        response = Response(_PROCEDURES_JSON, mimetype='application/json')
+    response.set_etag(_PROCEDURES_ETAG)
+    return response
 
 @app.route('/api/generate-simulation', methods=['POST'])
 def generate_simulation():
     """Generate a new surgical simulation"""
     try:
-        config = request.json
+        config = _request_data()
+        if config.get('difficulty_level') not in DIFFICULTY_LEVELS:
+            return jsonify({
+                "error": f"difficulty_level must be one of {', '.join(DIFFICULTY_LEVELS)}",
+                "status": "error"
+            }), 400
         
-        # Generate patient profile
-        patient = patient_gen.generate_patient(
+        # Every request draws a new patient and new complications; only the
+        # deterministic scenario base is cached, inside the generator
+        patient = _patient_gen().generate_patient(
             age_range=config.get('age_range', [20, 80]),
             gender=config.get('gender', 'random'),
             medical_history=config.get('medical_history', [])
         )
         
         # Generate simulation scenario
-        simulation = simulation_gen.generate_scenario(
+        simulation = _simulation_gen().generate_scenario(
             procedure_type=config['procedure_type'],
             difficulty_level=config['difficulty_level'],
             patient_profile=patient,
@@ -97,37 +262,40 @@ def generate_simulation():
         )
         
         # Store simulation in database
-        simulation_id = str(uuid.uuid4())
-        db_manager.save_simulation(simulation_id, simulation, patient)
+        simulation_id = _new_simulation_id()
+        patient_json = orjson.dumps(patient, option=app.json.option)
+        simulation_json = orjson.dumps(simulation, option=app.json.option)
+        db_manager.save_simulation(simulation_id, simulation, patient,
+                                   patient_json=patient_json, simulation_json=simulation_json)
         
-        return jsonify({
-            "simulation_id": simulation_id,
-            "patient": patient,
-            "simulation": simulation,
-            "status": "success"
-        })
+        # The blobs just encoded for the database are spliced into the response as-is
+        return Response(
+            b'{"simulation_id":%s,"patient":%s,"simulation":%s,"status":"success"}'
+            % (orjson.dumps(simulation_id), patient_json, simulation_json),
+            mimetype='application/json'
+        )
         
     except Exception as e:
         return jsonify({"error": str(e), "status": "error"}), 500
 
-@app.route('/api/simulation/<simulation_id>/step', methods=['POST'])
-def process_simulation_step(simulation_id):
-    """Process a simulation step and provide feedback"""
-    try:
-        data = request.json
-        step_number = data['step_number']
-        user_actions = data['actions']
-        time_taken = data['time_taken']
-        
-        # Get simulation data
-        simulation_data = db_manager.get_simulation(simulation_id)
+def _process_steps(simulation_id, steps):
+    """Assess a list of submitted steps against one read of the simulation"""
+    simulation_data = _get_simulation(simulation_id)
+    assessment_engine = _assessment_engine()
+    simulation_gen = _simulation_gen()
+    
+    results = []
+    saved = []
+    for step in steps:
+        step_number = step['step_number']
+        user_actions = step['actions']
         
         # Assess performance
         assessment = assessment_engine.assess_step(
             simulation_data,
             step_number,
             user_actions,
-            time_taken
+            step['time_taken']
         )
         
         # Generate next step or complications
@@ -137,17 +305,34 @@ def process_simulation_step(simulation_id):
             assessment
         )
         
-        # Update simulation state
-        db_manager.update_simulation_progress(
-            simulation_id,
-            step_number,
-            assessment,
-            user_actions
-        )
+        results.append({"assessment": assessment, "next_step": next_step})
+        saved.append((step_number, assessment, user_actions))
+    
+    # Committed before the response, so every worker process sees the steps
+    if not db_manager.update_simulation_progress_bulk(simulation_id, saved):
+        raise RuntimeError(f"Failed to save steps of simulation {simulation_id}")
+    _invalidate_simulation(simulation_id)
+    return results
+
+@app.route('/api/simulation/<simulation_id>/step', methods=['POST'])
+def process_simulation_step(simulation_id):
+    """Process a simulation step and provide feedback"""
+    try:
+        result = _process_steps(simulation_id, [_request_data()])[0]
+        result["status"] = "success"
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({"error": str(e), "status": "error"}), 500
+
+@app.route('/api/simulation/<simulation_id>/steps', methods=['POST'])
+def process_simulation_steps(simulation_id):
+    """Process several simulation steps in one request"""
+    try:
+        results = _process_steps(simulation_id, _request_data()['steps'])
         
         return jsonify({
-            "assessment": assessment,
-            "next_step": next_step,
+            "results": results,
             "status": "success"
         })
         
@@ -158,10 +343,12 @@ def process_simulation_step(simulation_id):
 def get_simulation_data(simulation_id):
     """Get simulation data by ID"""
     try:
-        simulation_data = db_manager.get_simulation(simulation_id)
+        simulation_data = _get_simulation(simulation_id)
         if not simulation_data:
             return jsonify({"error": "Simulation not found"}), 404
-            
+        
+        # Read by set_cache_headers, which would otherwise have to parse the body
+        g.simulation_status = simulation_data.get('status')
         return jsonify({
             "simulation": simulation_data,
             "status": "success"
@@ -170,20 +357,43 @@ def get_simulation_data(simulation_id):
     except Exception as e:
         return jsonify({"error": str(e), "status": "error"}), 500
 
+VITALS_FIELDS = {
+    **{field: ('patient_data', f'$.vitals.{path}') for field, path in zip(VITAL_FIELDS, VITAL_PATHS)},
+    'complications': ('simulation_data', '$.complications')
+}
+
+# Baseline vitals and scenario complications never change once a simulation is
+# saved, so each worker binds them into a sampler on the first poll
+_vitals_samplers = LRUCache(maxsize=1024)
+
+def _vitals_sampler(simulation_id):
+    """Vitals sampler for a simulation, or None if it does not exist"""
+    sampler = _vitals_samplers.get(simulation_id)
+    if sampler is None:
+        simulation_data = db_manager.get_simulation_fields(simulation_id, VITALS_FIELDS)
+        if not simulation_data:
+            return None
+        sampler = _simulation_gen().vitals_sampler(
+            [simulation_data[field] for field in VITAL_FIELDS],
+            simulation_data['complications'] or []
+        )
+        _vitals_samplers.set(simulation_id, sampler)
+    return sampler
+
 @app.route('/api/simulation/<simulation_id>/vitals', methods=['GET'])
 def get_patient_vitals(simulation_id):
     """Get current patient vitals for the simulation"""
     try:
-        simulation_data = db_manager.get_simulation(simulation_id)
-        current_vitals = simulation_gen.generate_current_vitals(
-            simulation_data['patient'],
-            simulation_data['current_step'],
-            simulation_data['complications']
-        )
+        # Polled repeatedly, so the stored blobs are read once per worker
+        sampler = _vitals_sampler(simulation_id)
+        if sampler is None:
+            return jsonify({"error": "Simulation not found"}), 404
+        
+        current_vitals = sampler(1)[0]
         
         return jsonify({
             "vitals": current_vitals,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "status": "success"
         })
         
@@ -195,15 +405,17 @@ def complete_simulation(simulation_id):
     """Complete simulation and generate final assessment"""
     try:
         # Get complete simulation data
-        simulation_data = db_manager.get_simulation(simulation_id)
+        simulation_data = _get_simulation(simulation_id)
         
         # Generate final assessment
-        final_assessment = assessment_engine.generate_final_assessment(
-            simulation_data
+        final_assessment = _assessment_engine().generate_final_assessment(
+            simulation_data,
+            db_manager.get_step_scores(simulation_id)
         )
         
         # Mark simulation as complete
         db_manager.complete_simulation(simulation_id, final_assessment)
+        _invalidate_simulation(simulation_id)
         
         return jsonify({
             "final_assessment": final_assessment,
@@ -218,18 +430,19 @@ def complete_simulation(simulation_id):
 def generate_complication():
     """Generate a dynamic complication during simulation"""
     try:
-        data = request.json
+        data = _request_data()
         simulation_id = data['simulation_id']
         current_step = data['current_step']
         
-        simulation_data = db_manager.get_simulation(simulation_id)
-        complication = simulation_gen.generate_dynamic_complication(
+        simulation_data = _get_simulation(simulation_id)
+        complication = _simulation_gen().generate_dynamic_complication(
             simulation_data,
             current_step
         )
         
         # Update simulation with complication
         db_manager.add_complication(simulation_id, complication)
+        _invalidate_simulation(simulation_id)
         
         return jsonify({
             "complication": complication,
@@ -244,12 +457,13 @@ def health_check():
     """Health check endpoint for monitoring"""
     try:
         # Check database connection
-        db_manager.get_connection()
+        with db_manager.connection() as conn:
+            conn.execute('SELECT 1')
         
         # Check application status
         return jsonify({
             "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "version": "1.0.0",
             "services": {
                 "database": "connected",
@@ -261,32 +475,64 @@ def health_check():
         return jsonify({
             "status": "unhealthy",
             "error": str(e),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }), 500
 
+# Scrapers can hit /metrics several times a second; serve one sample per window
+METRICS_TTL = 1.0
+_metrics_cache = {'ts': 0.0, 'data': None, 'boot_time': None}
+
 @app.route('/metrics')
 def metrics():
     """Application metrics endpoint"""
     try:
-        import psutil
+        now = time.monotonic()
+        if _metrics_cache['data'] is None or now - _metrics_cache['ts'] >= METRICS_TTL:
+            import psutil
+            
+            if _metrics_cache['boot_time'] is None:
+                _metrics_cache['boot_time'] = psutil.boot_time()
+            
+            _metrics_cache['data'] = {
+                "cpu_percent": psutil.cpu_percent(),
+                "memory_percent": psutil.virtual_memory().percent,
+                "disk_usage": psutil.disk_usage('/').percent,
+                "active_connections": len(psutil.Process().connections()),
+                "uptime": time.time() - _metrics_cache['boot_time'],
+                "timestamp": now_iso()
+            }
+            _metrics_cache['ts'] = now
         
-        return jsonify({
-            "cpu_percent": psutil.cpu_percent(),
-            "memory_percent": psutil.virtual_memory().percent,
-            "disk_usage": psutil.disk_usage('/').percent,
-            "active_connections": len(psutil.net_connections()),
-            "uptime": time.time() - psutil.boot_time(),
-            "timestamp": datetime.now().isoformat()
-        })
+        return jsonify(_metrics_cache['data'])
     except Exception as e:
         return jsonify({
             "error": str(e),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }), 500
 
-if __name__ == '__main__':
+def serve_forever(server):
+    """Accept connections on an already-bound server until stopped"""
+    server.start_accepting()
+    server._stop_event.wait()
+
+if __name__ == '__main__' and os.environ.get('FLASK_DEV'):
+    # Werkzeug debugger and reloader, for local development only
+    db_manager.init_database()
+    app.run(debug=True, host='0.0.0.0', port=5000)
+elif __name__ == '__main__':
+    from multiprocessing import Process, cpu_count
+    from gevent.pywsgi import WSGIServer
+
     # Initialize database
     db_manager.init_database()
     
-    # Run application
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Bind once in the parent, then fork one worker per core; every worker
+    # accepts on the shared listening socket
+    server = WSGIServer(('0.0.0.0', 5000), app)
+    server.start()
+    
+    workers = [Process(target=serve_forever, args=(server,)) for _ in range(cpu_count())]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
\ No newline at end of file
@@ -0,0 +1,7 @@
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app
+
+# ASGI entry point so the Flask app can be served from an event loop:
+#   uvicorn asgi:asgi_app --workers 4 --loop uvloop
+asgi_app = WsgiToAsgi(app)
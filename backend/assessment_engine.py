@@ -1,14 +1,155 @@
-import json
+import bisect
+import functools
 import random
-from typing import Dict, List, Any
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Any, Tuple
 from datetime import datetime
 
+import numpy as np
+
+from caching import now_iso
+from jit import NUMBA_AVAILABLE, njit
+
+# Smaller action lists are scored in plain Python; packing arrays costs more
+VECTORIZE_MIN_ACTIONS = 16
+
+@njit(cache=True)
+def _technical_skill_kernel(accuracy, expected_time, time_taken):
+    """Score a skill's actions by accuracy, discounting the running total on overruns"""
+    score = 0.0
+    for i in range(accuracy.shape[0]):
+        if accuracy[i] > 0.8:
+            score += 20.0
+        elif accuracy[i] > 0.6:
+            score += 15.0
+        else:
+            score += 5.0
+        
+        if time_taken > expected_time[i] * 1.5:
+            score *= 0.8
+    return score
+
+@njit(cache=True)
+def _communication_kernel(clarity, timing, professionalism):
+    """Award 25 points for each communication quality above 0.8"""
+    score = 0.0
+    for i in range(clarity.shape[0]):
+        if clarity[i] > 0.8:
+            score += 25.0
+        if timing[i] > 0.8:
+            score += 25.0
+        if professionalism[i] > 0.8:
+            score += 25.0
+    return score
+
+# Tenths of a correct decision credited per outcome; anything else scores zero
+DECISION_OUTCOME_POINTS = {'correct': 10, 'safe_alternative': 7}
+
+@njit(cache=True)
+def _decision_kernel(outcome_points):
+    """Percentage of decisions that were correct, with safe alternatives at 0.7"""
+    total = 0
+    for i in range(outcome_points.shape[0]):
+        total += outcome_points[i]
+    return total * 10.0 / outcome_points.shape[0]
+
+def _actions_to_columns(actions: List[Dict]) -> Dict[str, np.ndarray]:
+    """Unpack action dicts into one array per field the step scorers read"""
+    n = len(actions)
+    
+    def column(field, default):
+        return np.fromiter((a.get(field, default) for a in actions), dtype=np.float64, count=n)
+    
+    return {
+        "type": np.array([a.get('type') for a in actions], dtype=object),
+        "clarity": column('clarity', 0),
+        "timing": column('timing', 0),
+        "professionalism": column('professionalism', 0),
+        "outcome": np.fromiter((DECISION_OUTCOME_POINTS.get(a.get('outcome'), 0) for a in actions),
+                               dtype=np.int8, count=n),
+        "hesitation_time": column('hesitation_time', 0),
+        "accuracy": column('accuracy', 1.0)
+    }
+
+if NUMBA_AVAILABLE:
+    # Compile up front so the first /step request doesn't pay for it
+    _technical_skill_kernel(np.zeros(1), np.zeros(1), 0.0)
+    _communication_kernel(np.zeros(1), np.zeros(1), np.zeros(1))
+    _decision_kernel(np.zeros(1, dtype=np.int8))
+
+# Step title/description keywords that make a technical skill relevant to it
+SKILL_KEYWORDS = {
+    'trocar_placement': ['trocar', 'insertion', 'pneumoperitoneum'],
+    'camera_navigation': ['laparoscopy', 'visualization', 'camera'],
+    'tissue_handling': ['dissection', 'grasping', 'manipulation'],
+    'critical_view_achievement': ['critical view', 'safety', 'triangle'],
+    'dissection_technique': ['dissect', 'separate', 'divide'],
+    'hemostasis': ['bleeding', 'clip', 'cautery', 'hemostasis']
+}
+
+_SKILL_PATTERNS = {
+    skill: re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+    for skill, keywords in SKILL_KEYWORDS.items()
+}
+
+@functools.lru_cache(maxsize=64)
+def _procedure_key(procedure_name: str) -> str:
+    """Scoring criteria key for a procedure's display name"""
+    return procedure_name.lower().replace(" ", "_")
+
+@functools.lru_cache(maxsize=256)
+def _expected_duration_seconds(duration_str: str) -> Tuple[int, int]:
+    """Parse an "A-B minutes" step duration into a (min, max) range in seconds"""
+    try:
+        duration_parts = duration_str.replace(' minutes', '').split('-')
+        return int(duration_parts[0]) * 60, int(duration_parts[-1]) * 60
+    except (AttributeError, ValueError):
+        return 10 * 60, 15 * 60
+
+# Score bands: bisect_right(thresholds, score) indexes the matching tuple entry
+LEVEL_THRESHOLDS = (60, 75, 90)
+LEVELS = ("poor", "needs_improvement", "good", "excellent")
+FINAL_LEVELS = (
+    ("Novice", "Foundational skills need development before attempting {procedure}."),
+    ("Developing", "Developing skills demonstrated. Continue practice on {procedure}."),
+    ("Proficient", "Good performance on {procedure} with areas for refinement."),
+    ("Outstanding", "Exceptional performance on {procedure} at {difficulty} level.")
+)
+
+FEEDBACK_THRESHOLDS = (55, 70, 85)
+TECHNICAL_FEEDBACK = (
+    "Significant technical deficiencies identified. Additional practice and supervision recommended.",
+    "Technical skills need improvement. Focus on instrument control and anatomical identification.",
+    "Good technical skills demonstrated with room for refinement in precision.",
+    "Excellent technical execution with proper instrument handling and surgical technique."
+)
+NON_TECHNICAL_FEEDBACK = (
+    "Poor team communication and questionable clinical decisions observed.",
+    "Communication and decision-making skills need development.",
+    "Good team interaction and appropriate clinical decisions made.",
+    "Outstanding communication and decision-making throughout the procedure."
+)
+
 class AssessmentEngine:
     def __init__(self):
+        # Both tables are built once per process and shared read-only by every engine
         self.scoring_criteria = self._load_scoring_criteria()
         self.feedback_templates = self._load_feedback_templates()
+        self._local = threading.local()
+    
+    @property
+    def _rng(self) -> random.Random:
+        """Random generator private to the calling thread"""
+        rng = getattr(self._local, 'rng', None)
+        if rng is None:
+            rng = self._local.rng = random.Random()
+        return rng
     
-    def _load_scoring_criteria(self) -> Dict:
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _load_scoring_criteria() -> Dict:
         """Load assessment criteria for different procedures"""
         return {
             "laparoscopic_cholecystectomy": {
@@ -42,37 +183,44 @@ class AssessmentEngine:
             }
         }
     
-    def _load_feedback_templates(self) -> Dict:
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _load_feedback_templates() -> Dict:
         """Load feedback message templates"""
         return {
-            "excellent": [
+            "excellent": (
                 "Outstanding technique demonstrated",
                 "Perfect execution of critical steps",
                 "Excellent decision-making under pressure"
-            ],
-            "good": [
+            ),
+            "good": (
                 "Good technique with minor areas for improvement",
                 "Solid understanding of procedure demonstrated",
                 "Appropriate response to complications"
-            ],
-            "needs_improvement": [
+            ),
+            "needs_improvement": (
                 "Technique needs refinement in key areas", 
                 "Consider additional practice on critical steps",
                 "Review anatomical landmarks and approach"
-            ],
-            "poor": [
+            ),
+            "poor": (
                 "Significant technical errors identified",
                 "Safety concerns with current approach",
                 "Requires substantial additional training"
-            ]
+            )
         }
     
     def assess_step(self, simulation_data: Dict, step_number: int, 
                    user_actions: List[Dict], time_taken: int) -> Dict:
         """Assess performance on a single simulation step"""
         
-        procedure_type = simulation_data['simulation']['procedure_info']['name'].lower().replace(" ", "_")
-        current_step = simulation_data['simulation']['steps'][step_number - 1]
+        # Stored simulations come back with the scenario merged at the top level
+        simulation = simulation_data.get('simulation', simulation_data)
+        procedure_type = _procedure_key(simulation['procedure_info']['name'])
+        current_step = simulation['steps'][step_number - 1]
+        
+        # Long action lists are unpacked once into columns for the vectorized scorers
+        columns = _actions_to_columns(user_actions) if len(user_actions) >= VECTORIZE_MIN_ACTIONS else None
         
         # Technical skill assessment
         technical_score = self._assess_technical_skills(
@@ -81,7 +229,7 @@ class AssessmentEngine:
         
         # Non-technical skill assessment  
         non_technical_score = self._assess_non_technical_skills(
-            current_step, user_actions, time_taken
+            current_step, user_actions, time_taken, columns
         )
         
         # Overall step score
@@ -100,9 +248,9 @@ class AssessmentEngine:
             "overall_score": overall_score,
             "feedback": feedback,
             "time_taken": time_taken,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "areas_for_improvement": self._identify_improvement_areas(
-                technical_score, non_technical_score, user_actions
+                technical_score, non_technical_score, user_actions, columns
             )
         }
     
@@ -116,10 +264,19 @@ class AssessmentEngine:
         total_score = 0.0
         total_weight = 0.0
         
+        # Newline-joined so no keyword can match across title and description
+        step_text = f"{step['title']}\n{step['description']}".lower()
+        
+        # Bucket action positions by category in one pass over the actions
+        by_category = defaultdict(list)
+        for i, action in enumerate(actions):
+            by_category[action.get('skill_category', '').lower()].append(i)
+        
         # Assess each relevant technical skill for this step
         for skill, scoring in criteria.items():
-            if self._is_skill_relevant_to_step(skill, step):
-                skill_score = self._score_technical_skill(skill, actions, time_taken)
+            if self._is_skill_relevant_to_step(skill, step_text):
+                skill_actions = self._actions_for_skill(skill, actions, by_category)
+                skill_score = self._score_technical_skill(skill_actions, time_taken)
                 weighted_score = skill_score * scoring["weight"]
                 total_score += weighted_score
                 total_weight += scoring["weight"]
@@ -127,16 +284,16 @@ class AssessmentEngine:
         return (total_score / total_weight * 100) if total_weight > 0 else 0.0
     
     def _assess_non_technical_skills(self, step: Dict, actions: List[Dict], 
-                                   time_taken: int) -> float:
+                                   time_taken: int, columns: Dict = None) -> float:
         """Assess non-technical skills (communication, decision-making, etc.)"""
         scores = []
         
         # Communication assessment
-        communication_score = self._assess_communication(actions)
+        communication_score = self._assess_communication(actions, columns)
         scores.append(communication_score * 0.30)
         
         # Decision-making assessment
-        decision_score = self._assess_decision_making(actions, step)
+        decision_score = self._assess_decision_making(actions, step, columns)
         scores.append(decision_score * 0.35)
         
         # Time management assessment
@@ -149,30 +306,65 @@ class AssessmentEngine:
         
         return sum(scores)
     
-    def _score_technical_skill(self, skill: str, actions: List[Dict], time_taken: int) -> float:
-        """Score a specific technical skill"""
+    def _actions_for_skill(self, skill: str, actions: List[Dict],
+                           by_category: Dict[str, List[int]]) -> List[Dict]:
+        """Actions whose category contains the skill name, in submission order"""
+        positions = [by_category[c] for c in by_category if skill in c]
+        if len(positions) == 1:
+            return [actions[i] for i in positions[0]]
+        # Overrun penalties compound, so merged buckets must keep the original order
+        return [actions[i] for i in sorted(i for bucket in positions for i in bucket)]
+    
+    def _score_technical_skill(self, skill_actions: List[Dict], time_taken: int) -> float:
+        """Score a specific technical skill from the actions performed for it"""
+        if len(skill_actions) >= VECTORIZE_MIN_ACTIONS:
+            accuracy = np.fromiter((a.get('accuracy', 0) for a in skill_actions),
+                                   dtype=np.float64, count=len(skill_actions))
+            expected_time = np.fromiter((a.get('expected_time', 300) for a in skill_actions),
+                                        dtype=np.float64, count=len(skill_actions))
+            if NUMBA_AVAILABLE:
+                return min(_technical_skill_kernel(accuracy, expected_time, float(time_taken)), 100.0)
+            
+            # Each overrun scales everything scored up to and including it, so an
+            # action's points are discounted once per overrun at or after it
+            points = np.where(accuracy > 0.8, 20.0, np.where(accuracy > 0.6, 15.0, 5.0))
+            overruns = (time_taken > expected_time * 1.5)[::-1].cumsum()[::-1]
+            return min(float((points * 0.8 ** overruns).sum()), 100.0)
+        
         score = 0.0
         
         # Analyze actions for skill-specific performance
-        for action in actions:
-            if skill in action.get('skill_category', '').lower():
-                # Score based on action quality
-                if action.get('accuracy', 0) > 0.8:
-                    score += 20
-                elif action.get('accuracy', 0) > 0.6:
-                    score += 15
-                else:
-                    score += 5
-                
-                # Penalize for excessive time
-                expected_time = action.get('expected_time', 300)
-                if time_taken > expected_time * 1.5:
-                    score *= 0.8
+        for action in skill_actions:
+            # Score based on action quality
+            if action.get('accuracy', 0) > 0.8:
+                score += 20
+            elif action.get('accuracy', 0) > 0.6:
+                score += 15
+            else:
+                score += 5
+            
+            # Penalize for excessive time
+            expected_time = action.get('expected_time', 300)
+            if time_taken > expected_time * 1.5:
+                score *= 0.8
         
         return min(score, 100.0)
     
-    def _assess_communication(self, actions: List[Dict]) -> float:
+    def _assess_communication(self, actions: List[Dict], columns: Dict = None) -> float:
         """Assess communication effectiveness"""
+        if columns is not None:
+            mask = columns["type"] == 'communication'
+            if not mask.any():
+                return 50.0  # Neutral score for no communication tracked
+            
+            clarity, timing, professionalism = (
+                columns[field][mask] for field in ('clarity', 'timing', 'professionalism')
+            )
+            if NUMBA_AVAILABLE:
+                return min(_communication_kernel(clarity, timing, professionalism), 100.0)
+            score = 25.0 * int((clarity > 0.8).sum() + (timing > 0.8).sum() + (professionalism > 0.8).sum())
+            return min(score, 100.0)
+        
         communication_actions = [a for a in actions if a.get('type') == 'communication']
         
         if not communication_actions:
@@ -189,31 +381,28 @@ class AssessmentEngine:
         
         return min(score, 100.0)
     
-    def _assess_decision_making(self, actions: List[Dict], step: Dict) -> float:
+    def _assess_decision_making(self, actions: List[Dict], step: Dict, columns: Dict = None) -> float:
         """Assess decision-making quality"""
+        if columns is not None:
+            outcome_points = columns["outcome"][columns["type"] == 'decision']
+            if not len(outcome_points):
+                return 70.0  # Default score if no decisions tracked
+            
+            if NUMBA_AVAILABLE:
+                return _decision_kernel(outcome_points)
+            return int(outcome_points.sum(dtype=np.int64)) * 10.0 / len(outcome_points)
+        
         decision_actions = [a for a in actions if a.get('type') == 'decision']
         
         if not decision_actions:
             return 70.0  # Default score if no decisions tracked
         
-        correct_decisions = 0
-        total_decisions = len(decision_actions)
-        
-        for decision in decision_actions:
-            if decision.get('outcome') == 'correct':
-                correct_decisions += 1
-            elif decision.get('outcome') == 'safe_alternative':
-                correct_decisions += 0.7
-        
-        return (correct_decisions / total_decisions * 100) if total_decisions > 0 else 70.0
+        outcome_points = sum(DECISION_OUTCOME_POINTS.get(a.get('outcome'), 0) for a in decision_actions)
+        return outcome_points * 10.0 / len(decision_actions)
     
     def _assess_time_management(self, time_taken: int, step: Dict) -> float:
         """Assess time management effectiveness"""
-        # Parse expected duration
-        duration_str = step.get('duration', '10-15 minutes')
-        duration_parts = duration_str.replace(' minutes', '').split('-')
-        expected_min = int(duration_parts[0]) * 60  # Convert to seconds
-        expected_max = int(duration_parts[1]) * 60
+        expected_min, expected_max = _expected_duration_seconds(step.get('duration', '10-15 minutes'))
         
         if expected_min <= time_taken <= expected_max:
             return 100.0
@@ -239,25 +428,10 @@ class AssessmentEngine:
         
         return min(score, 100.0)
     
-    def _is_skill_relevant_to_step(self, skill: str, step: Dict) -> bool:
-        """Check if a skill is relevant to the current step"""
-        step_title = step['title'].lower()
-        step_desc = step['description'].lower()
-        
-        skill_keywords = {
-            'trocar_placement': ['trocar', 'insertion', 'pneumoperitoneum'],
-            'camera_navigation': ['laparoscopy', 'visualization', 'camera'],
-            'tissue_handling': ['dissection', 'grasping', 'manipulation'],
-            'critical_view_achievement': ['critical view', 'safety', 'triangle'],
-            'dissection_technique': ['dissect', 'separate', 'divide'],
-            'hemostasis': ['bleeding', 'clip', 'cautery', 'hemostasis']
-        }
-        
-        if skill in skill_keywords:
-            keywords = skill_keywords[skill]
-            return any(keyword in step_title or keyword in step_desc for keyword in keywords)
-        
-        return False
+    def _is_skill_relevant_to_step(self, skill: str, step_text: str) -> bool:
+        """Check if a skill is relevant to a step's lowercased title and description"""
+        pattern = _SKILL_PATTERNS.get(skill)
+        return pattern is not None and pattern.search(step_text) is not None
     
     def _generate_step_feedback(self, overall_score: float, technical_score: float,
                                non_technical_score: float, step: Dict, 
@@ -265,19 +439,16 @@ class AssessmentEngine:
         """Generate detailed feedback for the step"""
         
         # Determine performance level
-        if overall_score >= 90:
-            level = "excellent"
-        elif overall_score >= 75:
-            level = "good"
-        elif overall_score >= 60:
-            level = "needs_improvement"
-        else:
-            level = "poor"
+        level = LEVELS[bisect.bisect_right(LEVEL_THRESHOLDS, overall_score)]
         
         # Generate specific feedback messages
+        summary = self._rng.choice(self.feedback_templates[level])
         feedback = {
             "overall_level": level,
-            "summary": random.choice(self.feedback_templates[level]),
+            "summary": summary,
+            # Flagged once here so the final assessment counts instead of rescanning
+            "safety_concern": 'safety' in summary.lower(),
+            "complication_noted": 'complication' in summary,
             "technical_feedback": self._generate_technical_feedback(technical_score, actions),
             "non_technical_feedback": self._generate_non_technical_feedback(non_technical_score),
             "recommendations": self._generate_recommendations(overall_score, step)
@@ -287,25 +458,11 @@ class AssessmentEngine:
     
     def _generate_technical_feedback(self, score: float, actions: List[Dict]) -> str:
         """Generate technical skill feedback"""
-        if score >= 85:
-            return "Excellent technical execution with proper instrument handling and surgical technique."
-        elif score >= 70:
-            return "Good technical skills demonstrated with room for refinement in precision."
-        elif score >= 55:
-            return "Technical skills need improvement. Focus on instrument control and anatomical identification."
-        else:
-            return "Significant technical deficiencies identified. Additional practice and supervision recommended."
+        return TECHNICAL_FEEDBACK[bisect.bisect_right(FEEDBACK_THRESHOLDS, score)]
     
     def _generate_non_technical_feedback(self, score: float) -> str:
         """Generate non-technical skill feedback"""
-        if score >= 85:
-            return "Outstanding communication and decision-making throughout the procedure."
-        elif score >= 70:
-            return "Good team interaction and appropriate clinical decisions made."
-        elif score >= 55:
-            return "Communication and decision-making skills need development."
-        else:
-            return "Poor team communication and questionable clinical decisions observed."
+        return NON_TECHNICAL_FEEDBACK[bisect.bisect_right(FEEDBACK_THRESHOLDS, score)]
     
     def _generate_recommendations(self, score: float, step: Dict) -> List[str]:
         """Generate specific recommendations for improvement"""
@@ -328,7 +485,7 @@ class AssessmentEngine:
     
     def _identify_improvement_areas(self, technical_score: float, 
                                   non_technical_score: float, 
-                                  actions: List[Dict]) -> List[str]:
+                                  actions: List[Dict], columns: Dict = None) -> List[str]:
         """Identify specific areas needing improvement"""
         areas = []
         
@@ -338,15 +495,22 @@ class AssessmentEngine:
             areas.append("Communication & Decision Making")
         
         # Analyze specific action patterns
-        if any(a.get('hesitation_time', 0) > 30 for a in actions):
+        if columns is not None:
+            hesitated = bool((columns["hesitation_time"] > 30).any())
+            imprecise = bool((columns["accuracy"] < 0.6).any())
+        else:
+            hesitated = any(a.get('hesitation_time', 0) > 30 for a in actions)
+            imprecise = any(a.get('accuracy', 1.0) < 0.6 for a in actions)
+        
+        if hesitated:
             areas.append("Confidence & Decision Speed")
         
-        if any(a.get('accuracy', 1.0) < 0.6 for a in actions):
+        if imprecise:
             areas.append("Precision & Accuracy")
         
         return areas
     
-    def generate_final_assessment(self, simulation_data: Dict) -> Dict:
+    def generate_final_assessment(self, simulation_data: Dict, score_rows: List[Tuple] = None) -> Dict:
         """Generate comprehensive final assessment"""
         
         # Collect all step assessments
@@ -355,20 +519,21 @@ class AssessmentEngine:
         if not step_assessments:
             return {"error": "No step assessments found"}
         
-        # Calculate overall scores
-        technical_scores = [a['technical_score'] for a in step_assessments]
-        non_technical_scores = [a['non_technical_score'] for a in step_assessments]
-        overall_scores = [a['overall_score'] for a in step_assessments]
-        
-        avg_technical = sum(technical_scores) / len(technical_scores)
-        avg_non_technical = sum(non_technical_scores) / len(non_technical_scores)
-        avg_overall = sum(overall_scores) / len(overall_scores)
+        # (step, technical, non-technical, overall, time taken) in step order
+        if score_rows is None:
+            score_rows = [
+                (a['step_number'], a['technical_score'], a['non_technical_score'],
+                 a['overall_score'], a['time_taken'])
+                for a in step_assessments
+            ]
         
-        # Calculate total time
-        total_time = sum(a['time_taken'] for a in step_assessments)
+        # All score reductions run over one contiguous (n, 5) buffer
+        scores = np.asarray(score_rows, dtype=np.float64)
+        avg_technical, avg_non_technical, avg_overall = (float(x) for x in scores[:, 1:4].mean(axis=0))
+        total_time = float(scores[:, 4].sum())
         
         # Generate performance trends
-        trends = self._analyze_performance_trends(step_assessments)
+        trends = self._analyze_performance_trends(scores[:, 3])
         
         # Generate comprehensive feedback
         final_feedback = self._generate_final_feedback(
@@ -397,10 +562,10 @@ class AssessmentEngine:
             },
             "performance_metrics": {
                 "total_time_minutes": round(total_time / 60, 1),
-                "complications_handled": len([
-                    a for a in step_assessments 
-                    if 'complication' in a.get('feedback', {}).get('summary', '')
-                ]),
+                "complications_handled": sum(
+                    self._feedback_flag(a, 'complication_noted', lambda summary: 'complication' in summary)
+                    for a in step_assessments
+                ),
                 "safety_violations": self._count_safety_violations(step_assessments),
                 "efficiency_rating": self._calculate_efficiency(total_time, simulation_data)
             },
@@ -411,17 +576,14 @@ class AssessmentEngine:
             "next_difficulty_ready": avg_overall >= 85
         }
     
-    def _analyze_performance_trends(self, assessments: List[Dict]) -> Dict:
-        """Analyze performance trends across steps"""
-        scores = [a['overall_score'] for a in assessments]
+    def _analyze_performance_trends(self, scores: np.ndarray) -> Dict:
+        """Analyze performance trends across steps from their overall scores"""
+        scores = np.asarray(scores, dtype=np.float64)
         
         # Calculate trend direction
         if len(scores) > 1:
-            first_half = scores[:len(scores)//2]
-            second_half = scores[len(scores)//2:]
-            
-            avg_first = sum(first_half) / len(first_half)
-            avg_second = sum(second_half) / len(second_half)
+            avg_first = scores[:len(scores)//2].mean()
+            avg_second = scores[len(scores)//2:].mean()
             
             if avg_second > avg_first + 5:
                 trend = "improving"
@@ -435,8 +597,8 @@ class AssessmentEngine:
         return {
             "direction": trend,
             "consistency": self._calculate_consistency(scores),
-            "peak_performance_step": scores.index(max(scores)) + 1,
-            "lowest_performance_step": scores.index(min(scores)) + 1
+            "peak_performance_step": int(scores.argmax()) + 1,
+            "lowest_performance_step": int(scores.argmin()) + 1
         }
     
     def _calculate_consistency(self, scores: List[float]) -> float:
@@ -444,31 +606,21 @@ class AssessmentEngine:
         if len(scores) < 2:
             return 100.0
         
-        variance = sum((x - sum(scores)/len(scores))**2 for x in scores) / len(scores)
-        std_dev = variance ** 0.5
+        std_dev = float(np.asarray(scores, dtype=np.float64).std())
         
         # Convert to consistency percentage (lower std_dev = higher consistency)
-        consistency = max(0, 100 - (std_dev * 2))
+        consistency = max(0.0, 100 - (std_dev * 2))
         return round(consistency, 1)
     
     def _generate_final_feedback(self, overall_score: float, trends: Dict, 
                                 simulation_data: Dict) -> Dict:
         """Generate comprehensive final feedback"""
-        procedure_name = simulation_data['simulation']['procedure_info']['name']
-        difficulty = simulation_data['simulation']['difficulty_level']
-        
-        if overall_score >= 90:
-            performance_level = "Outstanding"
-            message = f"Exceptional performance on {procedure_name} at {difficulty} level."
-        elif overall_score >= 75:
-            performance_level = "Proficient"
-            message = f"Good performance on {procedure_name} with areas for refinement."
-        elif overall_score >= 60:
-            performance_level = "Developing"
-            message = f"Developing skills demonstrated. Continue practice on {procedure_name}."
-        else:
-            performance_level = "Novice"
-            message = f"Foundational skills need development before attempting {procedure_name}."
+        simulation = simulation_data.get('simulation', simulation_data)
+        procedure_name = simulation['procedure_info']['name']
+        difficulty = simulation['difficulty_level']
+        
+        performance_level, message = FINAL_LEVELS[bisect.bisect_right(LEVEL_THRESHOLDS, overall_score)]
+        message = message.format(procedure=procedure_name, difficulty=difficulty)
         
         return {
             "performance_level": performance_level,
@@ -519,16 +671,22 @@ class AssessmentEngine:
     
     def _count_safety_violations(self, assessments: List[Dict]) -> int:
         """Count safety violations across all steps"""
-        violations = 0
-        for assessment in assessments:
-            feedback = assessment.get('feedback', {})
-            if 'safety' in feedback.get('summary', '').lower():
-                violations += 1
-        return violations
+        return sum(
+            self._feedback_flag(a, 'safety_concern', lambda summary: 'safety' in summary.lower())
+            for a in assessments
+        )
+    
+    def _feedback_flag(self, assessment: Dict, flag: str, from_summary) -> bool:
+        """Read a feedback flag, deriving it from the summary for steps saved without one"""
+        feedback = assessment.get('feedback', {})
+        if flag in feedback:
+            return feedback[flag]
+        return from_summary(feedback.get('summary', ''))
     
     def _calculate_efficiency(self, total_time: int, simulation_data: Dict) -> str:
         """Calculate efficiency rating"""
-        expected_duration = simulation_data['simulation']['procedure_info'].get('estimated_duration', 60) * 60
+        simulation = simulation_data.get('simulation', simulation_data)
+        expected_duration = simulation['procedure_info'].get('estimated_duration', 60) * 60
         
         if total_time <= expected_duration:
             return "Excellent"
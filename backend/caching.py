@@ -0,0 +1,58 @@
+"""In-process caches shared by the app, the generators, the assessment engine
+and the database layer.
+
+Each worker process keeps its own copy; nothing here is visible across processes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+class LRUCache:
+    """Thread-safe LRU with optional expiry; a None key bypasses it, as Flask-Compress expects"""
+    
+    def __init__(self, maxsize=512, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (value, monotonic expiry or None)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        if key is None:
+            return
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+_timestamp_cache = (0, '')
+
+def now_iso() -> str:
+    """Current time as an ISO 8601 string, formatted at most once per second"""
+    global _timestamp_cache
+    second = int(time.time())
+    if _timestamp_cache[0] != second:
+        _timestamp_cache = (second, datetime.fromtimestamp(second).isoformat())
+    return _timestamp_cache[1]
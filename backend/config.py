@@ -1,7 +1,15 @@
 import os
-from dotenv import load_dotenv
+from types import MappingProxyType
 
-load_dotenv()
+# Only pay for python-dotenv when a .env file is actually deployed (backend/ or
+# the project root); orchestrated deployments inject the environment directly
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+for _env_dir in (_BACKEND_DIR, os.path.dirname(_BACKEND_DIR)):
+    _env_file = os.path.join(_env_dir, '.env')
+    if os.path.isfile(_env_file):
+        from dotenv import load_dotenv
+        load_dotenv(_env_file)
+        break
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'surgical-sim-secret-key-2024'
@@ -17,8 +25,8 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     DEBUG = False
     
-config = {
+config = MappingProxyType({
     'development': DevelopmentConfig,
     'production': ProductionConfig,
     'default': DevelopmentConfig
-}
+})
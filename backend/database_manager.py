@@ -1,117 +1,245 @@
 import sqlite3
-import json
-from datetime import datetime
-from typing import Dict, List, Any
+import queue
+from contextlib import contextmanager
+from typing import Dict, List, Any, Tuple
 import os
+import threading
+import time
+
+import orjson
+
+from caching import LRUCache
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes, bound as CAST(? AS TEXT) so JSON1 still sees text"""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+# Seconds a computed get_user_statistics result is served before re-aggregating
+STATISTICS_TTL = 60
+
+# Users whose statistics are kept; the least recently read are evicted first
+STATISTICS_CACHE_SIZE = 128
+
+# Tables whose rows belong to a simulation and are deleted along with it
+CHILD_TABLES = ('step_assessments', 'complications', 'user_sessions', 'performance_metrics')
+
+# Simulations removed per transaction by cleanup_old_simulations
+CLEANUP_BATCH_SIZE = 1000
+
+# Comfortably above the number of distinct SQL statements issued by this module
+STATEMENT_CACHE_SIZE = 128
+
+# Columns holding integer epoch milliseconds (older databases stored text)
+TIMESTAMP_COLUMNS = (
+    ('simulations', 'created_at'), ('simulations', 'completed_at'),
+    ('step_assessments', 'timestamp'), ('complications', 'timestamp'),
+    ('user_sessions', 'start_time'), ('user_sessions', 'end_time'),
+    ('performance_metrics', 'recorded_at')
+)
+
+# Bumped whenever init_database gains a data migration
+SCHEMA_VERSION = 1
+
+def _now_ms() -> int:
+    """Current time as integer epoch milliseconds"""
+    return int(time.time() * 1000)
 
 class DatabaseManager:
-    def __init__(self, db_path: str = "surgical_simulations.db"):
+    def __init__(self, db_path: str = "surgical_simulations.db", pool_size: int = 20):
         self.db_path = db_path
+        self.pool_size = pool_size
+        self._pool_lock = threading.Lock()
+        # Step batches waiting to share the next step-row transaction
+        self._step_buffer = []
+        self._step_buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # user_id -> encoded statistics; each hit decodes a fresh copy
+        self._statistics_cache = LRUCache(maxsize=STATISTICS_CACHE_SIZE, ttl=STATISTICS_TTL)
+        self._reset_pool()
         self.init_database()
     
-    def init_database(self):
-        """Initialize database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Simulations table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS simulations (
-                id TEXT PRIMARY KEY,
-                procedure_type TEXT NOT NULL,
-                difficulty_level TEXT NOT NULL,
-                patient_data TEXT NOT NULL,
-                simulation_data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP NULL,
-                status TEXT DEFAULT 'active'
-            )
-        ''')
-        
-        # Step assessments table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS step_assessments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                simulation_id TEXT NOT NULL,
-                step_number INTEGER NOT NULL,
-                technical_score REAL NOT NULL,
-                non_technical_score REAL NOT NULL,
-                overall_score REAL NOT NULL,
-                time_taken INTEGER NOT NULL,
-                user_actions TEXT NOT NULL,
-                feedback TEXT NOT NULL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (simulation_id) REFERENCES simulations (id)
-            )
-        ''')
-        
-        # Complications table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS complications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                simulation_id TEXT NOT NULL,
-                complication_type TEXT NOT NULL,
-                severity TEXT NOT NULL,
-                trigger_step INTEGER NOT NULL,
-                resolved BOOLEAN DEFAULT FALSE,
-                resolution_time INTEGER NULL,
-                management_actions TEXT NULL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (simulation_id) REFERENCES simulations (id)
-            )
-        ''')
-        
-        # User sessions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                user_id TEXT NULL,
-                simulation_id TEXT NOT NULL,
-                start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                end_time TIMESTAMP NULL,
-                session_data TEXT NULL,
-                FOREIGN KEY (simulation_id) REFERENCES simulations (id)
-            )
-        ''')
-        
-        # Performance metrics table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS performance_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                simulation_id TEXT NOT NULL,
-                metric_name TEXT NOT NULL,
-                metric_value REAL NOT NULL,
-                metric_data TEXT NULL,
-                recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (simulation_id) REFERENCES simulations (id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+    def _reset_pool(self):
+        """Start an empty pool owned by the current process"""
+        self._pool = queue.Queue(maxsize=self.pool_size)
+        self._pool_opened = 0
+        self._pool_pid = os.getpid()
     
-    def save_simulation(self, simulation_id: str, simulation_data: Dict, 
-                       patient_data: Dict) -> bool:
-        """Save a new simulation to database"""
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a connection tuned for many short reads alongside occasional writes"""
+        # The SQL literals below are identical strings on every call, so the
+        # per-connection statement cache serves each one already prepared
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        # WAL lets readers proceed during a write; NORMAL sync is durable in WAL mode
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        # Workers share the file; wait out another process's write lock instead of failing
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.execute('PRAGMA wal_autocheckpoint=1000')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-64000')
+        conn.execute('PRAGMA mmap_size=268435456')
+        return conn
+    
+    def get_connection(self) -> sqlite3.Connection:
+        """Check a connection out of the pool, opening one if the pool has room"""
+        with self._pool_lock:
+            # SQLite handles must not cross a fork; forked workers start afresh
+            if self._pool_pid != os.getpid():
+                self._reset_pool()
+            try:
+                return self._pool.get_nowait()
+            except queue.Empty:
+                if self._pool_opened < self.pool_size:
+                    self._pool_opened += 1
+                    return self._open_connection()
+        return self._pool.get()
+    
+    def release_connection(self, conn: sqlite3.Connection):
+        """Return a checked-out connection to the pool"""
+        if self._pool_pid == os.getpid():
+            self._pool.put(conn)
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection for the duration of a with-block"""
+        conn = self.get_connection()
         try:
-            conn = sqlite3.connect(self.db_path)
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release_connection(conn)
+    
+    def init_database(self):
+        """Initialize database with required tables"""
+        with self.connection() as conn:
             cursor = conn.cursor()
             
+            # Simulations table
             cursor.execute('''
-                INSERT INTO simulations 
-                (id, procedure_type, difficulty_level, patient_data, simulation_data)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                simulation_id,
-                simulation_data['procedure_info']['name'],
-                simulation_data['difficulty_level'],
-                json.dumps(patient_data),
-                json.dumps(simulation_data)
-            ))
+                CREATE TABLE IF NOT EXISTS simulations (
+                    id TEXT PRIMARY KEY,
+                    procedure_type TEXT NOT NULL,
+                    difficulty_level TEXT NOT NULL,
+                    patient_data TEXT NOT NULL,
+                    simulation_data TEXT NOT NULL,
+                    created_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER) * 1000),
+                    completed_at INTEGER NULL,
+                    status TEXT DEFAULT 'active'
+                )
+            ''')
+            
+            # Step assessments table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS step_assessments (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    simulation_id TEXT NOT NULL,
+                    step_number INTEGER NOT NULL,
+                    technical_score REAL NOT NULL,
+                    non_technical_score REAL NOT NULL,
+                    overall_score REAL NOT NULL,
+                    time_taken INTEGER NOT NULL,
+                    user_actions TEXT NOT NULL,
+                    feedback TEXT NOT NULL,
+                    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER) * 1000),
+                    FOREIGN KEY (simulation_id) REFERENCES simulations (id)
+                )
+            ''')
+            
+            # Complications table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS complications (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    simulation_id TEXT NOT NULL,
+                    complication_type TEXT NOT NULL,
+                    severity TEXT NOT NULL,
+                    trigger_step INTEGER NOT NULL,
+                    resolved BOOLEAN DEFAULT FALSE,
+                    resolution_time INTEGER NULL,
+                    management_actions TEXT NULL,
+                    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER) * 1000),
+                    FOREIGN KEY (simulation_id) REFERENCES simulations (id)
+                )
+            ''')
+            
+            # User sessions table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS user_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    user_id TEXT NULL,
+                    simulation_id TEXT NOT NULL,
+                    start_time INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER) * 1000),
+                    end_time INTEGER NULL,
+                    session_data TEXT NULL,
+                    FOREIGN KEY (simulation_id) REFERENCES simulations (id)
+                )
+            ''')
+            
+            # Performance metrics table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS performance_metrics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    simulation_id TEXT NOT NULL,
+                    metric_name TEXT NOT NULL,
+                    metric_value REAL NOT NULL,
+                    metric_data TEXT NULL,
+                    recorded_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER) * 1000),
+                    FOREIGN KEY (simulation_id) REFERENCES simulations (id)
+                )
+            ''')
+            
+            # Indexes for the per-simulation lookups and status filters
+            cursor.executescript('''
+                CREATE INDEX IF NOT EXISTS idx_step_sim ON step_assessments(simulation_id, step_number);
+                CREATE INDEX IF NOT EXISTS idx_comp_sim ON complications(simulation_id);
+                CREATE INDEX IF NOT EXISTS idx_perf_sim_name ON performance_metrics(simulation_id, metric_name);
+                CREATE INDEX IF NOT EXISTS idx_perf_name_sim_value ON performance_metrics(metric_name, simulation_id, metric_value);
+                CREATE INDEX IF NOT EXISTS idx_sim_status_created ON simulations(status, created_at);
+                CREATE INDEX IF NOT EXISTS idx_us_sim ON user_sessions(simulation_id, user_id);
+            ''')
+            
+            # Convert text timestamps written by earlier versions in place
+            if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                for table, column in TIMESTAMP_COLUMNS:
+                    cursor.execute(f'''
+                        UPDATE {table}
+                        SET {column} = CAST(strftime('%s', {column}) AS INTEGER) * 1000
+                        WHERE typeof({column}) = 'text'
+                    ''')
+                cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
             
             conn.commit()
-            conn.close()
+            
+            # Refresh planner statistics for the new indexes, bounded so
+            # startup stays fast on large databases
+            conn.execute('PRAGMA analysis_limit=400')
+            conn.execute('PRAGMA optimize')
+    
+    def save_simulation(self, simulation_id: str, simulation_data: Dict, 
+                       patient_data: Dict, patient_json: bytes = None,
+                       simulation_json: bytes = None) -> bool:
+        """Save a new simulation to database, reusing either blob if it is already encoded"""
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    INSERT INTO simulations 
+                    (id, procedure_type, difficulty_level, patient_data, simulation_data, created_at)
+                    VALUES (?, ?, ?, CAST(? AS TEXT), CAST(? AS TEXT), ?)
+                ''', (
+                    simulation_id,
+                    simulation_data['procedure_info']['name'],
+                    simulation_data['difficulty_level'],
+                    _dumps(patient_data) if patient_json is None else patient_json,
+                    _dumps(simulation_data) if simulation_json is None else simulation_json,
+                    _now_ms()
+                ))
+                
+                conn.commit()
             return True
             
         except Exception as e:
@@ -120,20 +248,19 @@ class DatabaseManager:
     
     def get_simulation(self, simulation_id: str) -> Dict:
         """Retrieve simulation data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT patient_data, simulation_data, status
-            FROM simulations WHERE id = ?
-        ''', (simulation_id,))
-        
-        result = cursor.fetchone()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT CAST(patient_data AS BLOB), CAST(simulation_data AS BLOB), status
+                FROM simulations WHERE id = ?
+            ''', (simulation_id,))
+            
+            result = cursor.fetchone()
         
         if result:
-            patient_data = json.loads(result[0])
-            simulation_data = json.loads(result[1])
+            patient_data = orjson.loads(result[0])
+            simulation_data = orjson.loads(result[1])
             
             # Get step assessments
             step_assessments = self.get_step_assessments(simulation_id)
@@ -152,88 +279,145 @@ class DatabaseManager:
         
         return {}
     
+    def get_simulation_fields(self, simulation_id: str, fields: Dict[str, Tuple[str, str]]) -> Dict:
+        """Extract {name: (column, JSON path)} values plus current_step without loading the blobs"""
+        for column, _ in fields.values():
+            if column not in ('patient_data', 'simulation_data'):
+                raise ValueError(f"Unknown simulation column: {column}")
+        
+        # json_quote keeps strings quoted and passes objects/arrays through, so
+        # every extracted value comes back as valid JSON text
+        selects = ', '.join(f'CAST(json_quote(json_extract({column}, ?)) AS BLOB)' for column, _ in fields.values())
+        with self.connection() as conn:
+            result = conn.execute(f'''
+                SELECT {selects},
+                       (SELECT COUNT(*) FROM step_assessments WHERE simulation_id = simulations.id)
+                FROM simulations WHERE id = ?
+            ''', (*(path for _, path in fields.values()), simulation_id)).fetchone()
+        
+        if not result:
+            return {}
+        
+        values = {name: orjson.loads(value) for name, value in zip(fields, result)}
+        values["current_step"] = result[-1]
+        return values
+    
     def update_simulation_progress(self, simulation_id: str, step_number: int,
                                  assessment: Dict, user_actions: List[Dict]) -> bool:
         """Update simulation progress with step assessment"""
+        return self.update_simulation_progress_bulk(
+            simulation_id, [(step_number, assessment, user_actions)]
+        )
+    
+    def update_simulation_progress_bulk(self, simulation_id: str,
+                                        steps: List[Tuple[int, Dict, List[Dict]]]) -> bool:
+        """Insert several (step_number, assessment, user_actions) rows, committed before returning"""
+        # [rows, saved]; saved stays None until a transaction has carried the rows
+        batch = [[(simulation_id, *step) for step in steps], None]
+        with self._step_buffer_lock:
+            self._step_buffer.append(batch)
+        
+        # Threads that queued while another held the lock share the next transaction
+        with self._flush_lock:
+            if batch[1] is None:
+                with self._step_buffer_lock:
+                    batches, self._step_buffer = self._step_buffer, []
+                saved = self._insert_step_rows([row for rows, _ in batches for row in rows])
+                for waiting in batches:
+                    waiting[1] = saved
+        return batch[1]
+    
+    def _insert_step_rows(self, rows: List[Tuple[str, int, Dict, List[Dict]]]) -> bool:
+        """Insert (simulation_id, step_number, assessment, user_actions) rows"""
+        now = _now_ms()
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO step_assessments 
-                (simulation_id, step_number, technical_score, non_technical_score,
-                 overall_score, time_taken, user_actions, feedback)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                simulation_id,
-                step_number,
-                assessment['technical_score'],
-                assessment['non_technical_score'],
-                assessment['overall_score'],
-                assessment['time_taken'],
-                json.dumps(user_actions),
-                json.dumps(assessment['feedback'])
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.executemany('''
+                    INSERT INTO step_assessments 
+                    (simulation_id, step_number, technical_score, non_technical_score,
+                     overall_score, time_taken, user_actions, feedback, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, CAST(? AS TEXT), CAST(? AS TEXT), ?)
+                ''', [(
+                    simulation_id,
+                    step_number,
+                    assessment['technical_score'],
+                    assessment['non_technical_score'],
+                    assessment['overall_score'],
+                    assessment['time_taken'],
+                    _dumps(user_actions),
+                    _dumps(assessment['feedback']),
+                    now
+                ) for simulation_id, step_number, assessment, user_actions in rows])
+                
+                conn.commit()
             return True
             
         except Exception as e:
             print(f"Error updating simulation progress: {e}")
             return False
     
+    def get_step_scores(self, simulation_id: str) -> List[Tuple]:
+        """Get (step, technical, non-technical, overall, time taken) rows for a simulation"""
+        with self.connection() as conn:
+            return conn.execute('''
+                SELECT step_number, technical_score, non_technical_score, 
+                       overall_score, time_taken
+                FROM step_assessments 
+                WHERE simulation_id = ?
+                ORDER BY step_number
+            ''', (simulation_id,)).fetchall()
+    
     def get_step_assessments(self, simulation_id: str) -> List[Dict]:
         """Get all step assessments for a simulation"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT step_number, technical_score, non_technical_score, 
-                   overall_score, time_taken, user_actions, feedback, timestamp
-            FROM step_assessments 
-            WHERE simulation_id = ?
-            ORDER BY step_number
-        ''', (simulation_id,))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        assessments = []
-        for row in results:
-            assessments.append({
-                "step_number": row[0],
-                "technical_score": row[1],
-                "non_technical_score": row[2],
-                "overall_score": row[3],
-                "time_taken": row[4],
-                "user_actions": json.loads(row[5]),
-                "feedback": json.loads(row[6]),
-                "timestamp": row[7]
-            })
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            # SQLite assembles the whole list as one JSON document, so Python
+            # parses once instead of twice per row
+            cursor.execute('''
+                SELECT CAST(json_group_array(json_object(
+                    'step_number', step_number,
+                    'technical_score', technical_score,
+                    'non_technical_score', non_technical_score,
+                    'overall_score', overall_score,
+                    'time_taken', time_taken,
+                    'user_actions', json(user_actions),
+                    'feedback', json(feedback),
+                    'timestamp', timestamp
+                )) AS BLOB)
+                FROM (
+                    SELECT * FROM step_assessments 
+                    WHERE simulation_id = ?
+                    ORDER BY step_number
+                )
+            ''', (simulation_id,))
+            
+            result = cursor.fetchone()
         
-        return assessments
+        return orjson.loads(result[0])
     
     def add_complication(self, simulation_id: str, complication: Dict) -> bool:
         """Add a complication to the simulation"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO complications 
-                (simulation_id, complication_type, severity, trigger_step, management_actions)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                simulation_id,
-                complication['type'],
-                complication['severity'],
-                complication.get('trigger_step', 0),
-                json.dumps(complication.get('management_options', []))
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    INSERT INTO complications 
+                    (simulation_id, complication_type, severity, trigger_step, management_actions, timestamp)
+                    VALUES (?, ?, ?, ?, CAST(? AS TEXT), ?)
+                ''', (
+                    simulation_id,
+                    complication['type'],
+                    complication['severity'],
+                    complication.get('trigger_step', 0),
+                    _dumps(complication.get('management_options', [])),
+                    _now_ms()
+                ))
+                
+                conn.commit()
             return True
             
         except Exception as e:
@@ -242,30 +426,31 @@ class DatabaseManager:
     
     def complete_simulation(self, simulation_id: str, final_assessment: Dict) -> bool:
         """Mark simulation as completed"""
+        now = _now_ms()
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                UPDATE simulations 
-                SET completed_at = CURRENT_TIMESTAMP, status = 'completed'
-                WHERE id = ?
-            ''', (simulation_id,))
-            
-            # Save final assessment as performance metric
-            cursor.execute('''
-                INSERT INTO performance_metrics
-                (simulation_id, metric_name, metric_value, metric_data)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                simulation_id,
-                "final_assessment",
-                final_assessment['scores']['overall_average'],
-                json.dumps(final_assessment)
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    UPDATE simulations 
+                    SET completed_at = ?, status = 'completed'
+                    WHERE id = ?
+                ''', (now, simulation_id))
+                
+                # Save final assessment as performance metric
+                cursor.execute('''
+                    INSERT INTO performance_metrics
+                    (simulation_id, metric_name, metric_value, metric_data, recorded_at)
+                    VALUES (?, ?, ?, CAST(? AS TEXT), ?)
+                ''', (
+                    simulation_id,
+                    "final_assessment",
+                    final_assessment['scores']['overall_average'],
+                    _dumps(final_assessment),
+                    now
+                ))
+                
+                conn.commit()
             return True
             
         except Exception as e:
@@ -274,73 +459,91 @@ class DatabaseManager:
     
     def get_user_statistics(self, user_id: str = None) -> Dict:
         """Get user performance statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get completed simulations
-        if user_id:
-            cursor.execute('''
-                SELECT s.procedure_type, s.difficulty_level, pm.metric_value
-                FROM simulations s
-                JOIN performance_metrics pm ON s.id = pm.simulation_id
-                JOIN user_sessions us ON s.id = us.simulation_id
-                WHERE s.status = 'completed' AND us.user_id = ?
-                AND pm.metric_name = 'final_assessment'
-            ''', (user_id,))
-        else:
-            cursor.execute('''
-                SELECT s.procedure_type, s.difficulty_level, pm.metric_value
-                FROM simulations s
-                JOIN performance_metrics pm ON s.id = pm.simulation_id
-                WHERE s.status = 'completed'
-                AND pm.metric_name = 'final_assessment'
-            ''')
+        # Wrapped because the cache treats a None key (all users) as uncacheable
+        key = (user_id,)
+        cached = self._statistics_cache.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
         
-        results = cursor.fetchall()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Aggregate completed simulations per procedure in SQLite
+            if user_id:
+                cursor.execute('''
+                    SELECT s.procedure_type, COUNT(*), SUM(pm.metric_value),
+                           json_group_array(pm.metric_value)
+                    FROM simulations s
+                    JOIN performance_metrics pm ON s.id = pm.simulation_id
+                    JOIN user_sessions us ON s.id = us.simulation_id
+                    WHERE s.status = 'completed' AND us.user_id = ?
+                    AND pm.metric_name = 'final_assessment'
+                    GROUP BY s.procedure_type
+                ''', (user_id,))
+            else:
+                cursor.execute('''
+                    SELECT s.procedure_type, COUNT(*), SUM(pm.metric_value),
+                           json_group_array(pm.metric_value)
+                    FROM simulations s
+                    JOIN performance_metrics pm ON s.id = pm.simulation_id
+                    WHERE s.status = 'completed'
+                    AND pm.metric_name = 'final_assessment'
+                    GROUP BY s.procedure_type
+                ''')
+            
+            results = cursor.fetchall()
         
         if not results:
             return {"message": "No completed simulations found"}
         
         # Analyze statistics
-        total_simulations = len(results)
+        total_simulations = sum(row[1] for row in results)
         avg_score = sum(row[2] for row in results) / total_simulations
         
-        procedure_stats = {}
-        for row in results:
-            procedure = row[0]
-            if procedure not in procedure_stats:
-                procedure_stats[procedure] = {"count": 0, "scores": []}
-            procedure_stats[procedure]["count"] += 1
-            procedure_stats[procedure]["scores"].append(row[2])
-        
-        # Calculate averages per procedure
-        for proc, stats in procedure_stats.items():
-            stats["average_score"] = sum(stats["scores"]) / len(stats["scores"])
+        procedure_stats = {
+            procedure: {
+                "count": count,
+                "scores": orjson.loads(scores),
+                "average_score": total / count
+            }
+            for procedure, count, total, scores in results
+        }
         
-        return {
+        statistics = {
             "total_simulations": total_simulations,
             "overall_average": round(avg_score, 1),
             "procedure_breakdown": procedure_stats,
-            "last_updated": datetime.now().isoformat()
+            "last_updated": _now_ms()
         }
+        self._statistics_cache.set(key, _dumps(statistics))
+        return statistics
     
     def cleanup_old_simulations(self, days_old: int = 30) -> int:
         """Clean up simulations older than specified days"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cutoff_date = datetime.now() - timedelta(days=days_old)
-            
-            cursor.execute('''
-                DELETE FROM simulations 
-                WHERE created_at < ? AND status = 'completed'
-            ''', (cutoff_date.isoformat(),))
-            
-            deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
+            deleted_count = 0
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                cutoff = _now_ms() - int(days_old) * 86_400_000
+                while True:
+                    cursor.execute('''
+                        SELECT id FROM simulations 
+                        WHERE created_at < ? AND status = 'completed'
+                        LIMIT ?
+                    ''', (cutoff, CLEANUP_BATCH_SIZE))
+                    batch = cursor.fetchall()
+                    if not batch:
+                        break
+                    
+                    # Child rows go in the same transaction as their simulation
+                    for table in CHILD_TABLES:
+                        cursor.executemany(f'DELETE FROM {table} WHERE simulation_id = ?', batch)
+                    cursor.executemany('DELETE FROM simulations WHERE id = ?', batch)
+                    
+                    # One commit per batch keeps the WAL from growing unbounded
+                    conn.commit()
+                    deleted_count += len(batch)
             
             return deleted_count
             
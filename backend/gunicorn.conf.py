@@ -7,8 +7,11 @@ backlog = 2048
 
 # Worker processes
 workers = int(os.environ.get('WORKERS', multiprocessing.cpu_count() * 2 + 1))
-worker_class = "sync"
+worker_class = os.environ.get('WORKER_CLASS', "gevent")
 worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 1000))
+# Used when WORKER_CLASS=gthread; SQLite calls do not yield to gevent's hub,
+# so threads overlap them where greenlets cannot
+threads = int(os.environ.get('THREADS', 4))
 timeout = int(os.environ.get('TIMEOUT', 30))
 keepalive = 2
 
@@ -20,9 +23,12 @@ max_requests_jitter = int(os.environ.get('MAX_REQUESTS_JITTER', 50))
 preload_app = True
 
 # Logging
-accesslog = os.environ.get('ACCESS_LOG', "logs/access.log")
-errorlog = os.environ.get('ERROR_LOG', "logs/error.log")
+# Default to stdout/stderr so journald/supervisor/docker buffer the output
+# instead of every worker writing to one shared file
+accesslog = os.environ.get('ACCESS_LOG', "-")
+errorlog = os.environ.get('ERROR_LOG', "-")
 loglevel = os.environ.get('LOG_LEVEL', "info")
+access_log_format = os.environ.get('ACCESS_LOG_FORMAT', '%(h)s %(t)s "%(r)s" %(s)s %(b)s %(M)sms')
 
 # Process naming
 proc_name = "surgical-simulation"
@@ -0,0 +1,18 @@
+"""Optional Numba support for numeric kernels.
+
+Kernels are decorated with ``njit`` from this module. When Numba is installed
+they are compiled to native code; otherwise the decorator is a no-op and the
+kernels run as plain Python/NumPy.
+"""
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Fallback that returns the decorated function unchanged"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -1,43 +1,93 @@
+import functools
 import random
-from typing import Dict, List, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
 from datetime import datetime, timedelta
 
+import numpy as np
+
+# (name, patients older than, probability) for the age-gated history and medications
+CONDITION_GATES = (
+    ("hypertension", 40, 0.3),
+    ("diabetes", 40, 0.2),
+    ("obesity", 50, 0.4),
+    ("previous_surgery", 50, 0.3)
+)
+MEDICATION_GATES = (
+    ("atorvastatin", 45, 0.4),
+    ("lisinopril", 45, 0.3),
+    ("aspirin", 60, 0.2)
+)
+
+# (field, low, high, integer) for the bulk path's independent numeric draws;
+# integer ranges are inclusive, the rest are rounded to one decimal
+NUMERIC_RANGES = (
+    ("heart_rate", 60, 100, True), ("systolic", 110, 140, True), ("diastolic", 70, 90, True),
+    ("respiratory_rate", 12, 20, True), ("temperature", 36.5, 37.2, False),
+    ("oxygen_saturation", 95, 100, True),
+    ("hemoglobin", 12.0, 16.0, False), ("hematocrit", 36.0, 48.0, False),
+    ("white_blood_cells", 4.0, 11.0, False), ("platelets", 150, 450, True),
+    ("sodium", 135, 145, True), ("potassium", 3.5, 5.0, False), ("chloride", 98, 108, True),
+    ("glucose", 80, 120, True), ("creatinine", 0.6, 1.2, False),
+    ("alt", 10, 40, True), ("ast", 10, 40, True), ("bilirubin", 0.2, 1.2, False),
+    ("pt", 11.0, 13.0, False), ("ptt", 25.0, 35.0, False), ("inr", 0.9, 1.1, False),
+    ("gallbladder_wall_thickness", 2.0, 8.0, False)
+)
+_NUMERIC_INTEGER = np.array([integer for *_, integer in NUMERIC_RANGES])
+_NUMERIC_LOW = np.array([low for _, low, _, _ in NUMERIC_RANGES], dtype=float)
+_NUMERIC_HIGH = np.array([high for _, _, high, _ in NUMERIC_RANGES], dtype=float) + _NUMERIC_INTEGER
+
+def _draw_numeric(rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+    """Draw every NUMERIC_RANGES column for n patients as one (n, k) uniform matrix"""
+    draws = rng.uniform(_NUMERIC_LOW, _NUMERIC_HIGH, (n, len(NUMERIC_RANGES)))
+    return {
+        field: np.floor(draws[:, j]).astype(int) if integer else draws[:, j].round(1)
+        for j, (field, _, _, integer) in enumerate(NUMERIC_RANGES)
+    }
+
 class PatientGenerator:
     def __init__(self):
+        # Both tables are built once per process and shared read-only by every generator
         self.medical_conditions = self._load_medical_conditions()
         self.medications = self._load_medications()
+        self.condition_names = frozenset(self.medical_conditions)
         
-    def _load_medical_conditions(self) -> Dict:
-        """Load medical condition templates"""
-        return {
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _load_medical_conditions() -> Mapping[str, Mapping]:
+        """Load medical condition templates, read-only since every generator shares them"""
+        conditions = {
             "diabetes": {
                 "type": "metabolic",
-                "complications": ["delayed wound healing", "infection risk"],
-                "management": ["glucose monitoring", "insulin adjustment"]
+                "complications": ("delayed wound healing", "infection risk"),
+                "management": ("glucose monitoring", "insulin adjustment")
             },
             "hypertension": {
                 "type": "cardiovascular", 
-                "complications": ["bleeding risk", "anesthesia considerations"],
-                "management": ["blood pressure monitoring", "medication adjustment"]
+                "complications": ("bleeding risk", "anesthesia considerations"),
+                "management": ("blood pressure monitoring", "medication adjustment")
             },
             "obesity": {
                 "type": "metabolic",
-                "complications": ["difficult visualization", "trocar placement challenges"],
-                "management": ["positioning considerations", "equipment selection"]
+                "complications": ("difficult visualization", "trocar placement challenges"),
+                "management": ("positioning considerations", "equipment selection")
             },
             "previous_surgery": {
                 "type": "surgical_history",
-                "complications": ["adhesions", "altered anatomy"],
-                "management": ["careful dissection", "adhesiolysis"]
+                "complications": ("adhesions", "altered anatomy"),
+                "management": ("careful dissection", "adhesiolysis")
             }
         }
+        return MappingProxyType({name: MappingProxyType(info) for name, info in conditions.items()})
     
-    def _load_medications(self) -> List[str]:
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _load_medications() -> Tuple[str, ...]:
         """Load common medications"""
-        return [
+        return (
             "metformin", "lisinopril", "atorvastatin", "metoprolol",
             "omeprazole", "aspirin", "warfarin", "levothyroxine"
-        ]
+        )
     
     def generate_patient(self, age_range: Tuple[int, int] = (20, 80), 
                         gender: str = "random", 
@@ -74,6 +124,146 @@ class PatientGenerator:
         
         return patient
     
+    def generate_patients(self, n: int, age_range: Tuple[int, int] = (20, 80),
+                          gender: str = "random",
+                          medical_history: List[str] = None) -> List[Dict]:
+        """Generate n patient profiles, drawing each field for the whole batch at once"""
+        rng = np.random.default_rng()
+        
+        def ints(low, high):
+            return rng.integers(low, high + 1, n)
+        
+        def choices(options):
+            return np.asarray(options, dtype=object)[rng.integers(0, len(options), n)]
+        
+        def coin():
+            return rng.random(n) < 0.5
+        
+        # Demographics
+        ages = ints(*age_range)
+        if gender == "random":
+            genders = choices(["male", "female"])
+        else:
+            genders = np.full(n, gender, dtype=object)
+        male = genders == "male"
+        weights = np.where(male, ints(65, 95), ints(55, 85)) + np.where(ages > 50, ints(0, 15), 0)
+        heights = np.where(male, ints(165, 190), ints(155, 180))
+        bmis = (weights / (heights / 100) ** 2).round(1)
+        
+        # History, medications and allergies: each probability gate is one mask
+        histories = [list(medical_history) if medical_history else [] for _ in range(n)]
+        if not medical_history:
+            for condition, min_age, probability in CONDITION_GATES:
+                for i in np.flatnonzero((ages > min_age) & (rng.random(n) < probability)):
+                    histories[i].append(condition)
+            for i in np.flatnonzero(rng.random(n) < 0.2):
+                remaining = sorted(self.condition_names.difference(histories[i]))
+                if remaining:
+                    histories[i].append(remaining[rng.integers(len(remaining))])
+        
+        medications = [[] for _ in range(n)]
+        for medication, min_age, probability in MEDICATION_GATES:
+            for i in np.flatnonzero((ages > min_age) & (rng.random(n) < probability)):
+                medications[i].append(medication)
+        extra_medications = choices(self.medications)
+        for i in np.flatnonzero(rng.random(n) < 0.3):
+            if extra_medications[i] not in medications[i]:
+                medications[i].append(extra_medications[i])
+        
+        common_allergies = ["penicillin", "latex", "iodine", "eggs", "shellfish"]
+        allergies = [[] for _ in range(n)]
+        for i in np.flatnonzero(rng.random(n) < 0.2):
+            picks = rng.choice(len(common_allergies), size=rng.integers(1, 3), replace=False)
+            allergies[i] = [common_allergies[j] for j in picks]
+        
+        # Every remaining field is an independent column of n draws
+        columns = {
+            "smoking": np.where(ages > 18, choices(["never", "former", "current"]), "never"),
+            "alcohol": np.where(ages > 21, choices(["none", "social", "moderate"]), "none"),
+            "occupation": choices(["teacher", "engineer", "nurse", "retired", "student"]),
+            "exercise": choices(["sedentary", "light", "moderate", "active"]),
+            **_draw_numeric(rng, n),
+            "stones_present": coin(), "pericholecystic_fluid": coin(), "murphy_sign": coin(),
+            "inflammation": choices(["none", "mild", "moderate", "severe"]),
+            "complications": choices(["none", "perforation", "abscess"]),
+            "anatomy_variants": coin()
+        }
+        # Plain Python scalars at the boundary, so patients serialize like generate_patient's
+        c = {name: column.tolist() for name, column in columns.items()}
+        ages, genders, weights, heights, bmis = (
+            column.tolist() for column in (ages, genders, weights, heights, bmis)
+        )
+        
+        return [
+            {
+                "demographics": {
+                    "age": ages[i],
+                    "gender": genders[i],
+                    "weight": weights[i],
+                    "height": heights[i],
+                    "bmi": bmis[i]
+                },
+                "medical_history": histories[i],
+                "medications": medications[i],
+                "allergies": allergies[i],
+                "social_history": {
+                    "smoking": c["smoking"][i],
+                    "alcohol": c["alcohol"][i],
+                    "occupation": c["occupation"][i],
+                    "exercise": c["exercise"][i]
+                },
+                "vitals": {
+                    "heart_rate": c["heart_rate"][i],
+                    "blood_pressure": {
+                        "systolic": c["systolic"][i],
+                        "diastolic": c["diastolic"][i]
+                    },
+                    "respiratory_rate": c["respiratory_rate"][i],
+                    "temperature": c["temperature"][i],
+                    "oxygen_saturation": c["oxygen_saturation"][i]
+                },
+                "lab_results": {
+                    "complete_blood_count": {
+                        "hemoglobin": c["hemoglobin"][i],
+                        "hematocrit": c["hematocrit"][i],
+                        "white_blood_cells": c["white_blood_cells"][i],
+                        "platelets": c["platelets"][i]
+                    },
+                    "basic_metabolic_panel": {
+                        "sodium": c["sodium"][i],
+                        "potassium": c["potassium"][i],
+                        "chloride": c["chloride"][i],
+                        "glucose": c["glucose"][i],
+                        "creatinine": c["creatinine"][i]
+                    },
+                    "liver_function": {
+                        "alt": c["alt"][i],
+                        "ast": c["ast"][i],
+                        "bilirubin": c["bilirubin"][i]
+                    },
+                    "coagulation": {
+                        "pt": c["pt"][i],
+                        "ptt": c["ptt"][i],
+                        "inr": c["inr"][i]
+                    }
+                },
+                "imaging": {
+                    "ultrasound": {
+                        "gallbladder_wall_thickness": c["gallbladder_wall_thickness"][i],
+                        "stones_present": c["stones_present"][i],
+                        "pericholecystic_fluid": c["pericholecystic_fluid"][i],
+                        "murphy_sign": c["murphy_sign"][i]
+                    },
+                    "ct_findings": {
+                        "inflammation": c["inflammation"][i],
+                        "complications": c["complications"][i],
+                        "anatomy_variants": c["anatomy_variants"][i]
+                    }
+                }
+            }
+            for i in range(n)
+        ]
+    
     def _generate_weight(self, age: int, gender: str) -> int:
         """Generate realistic weight based on demographics"""
         if gender == "male":
@@ -96,43 +286,27 @@ class PatientGenerator:
     
     def _generate_medical_history(self, age: int) -> List[str]:
         """Generate age-appropriate medical history"""
-        conditions = []
-        
         # Age-based probability of conditions
-        if age > 40:
-            if random.random() < 0.3:
-                conditions.append("hypertension")
-            if random.random() < 0.2:
-                conditions.append("diabetes")
-        
-        if age > 50:
-            if random.random() < 0.4:
-                conditions.append("obesity")
-            if random.random() < 0.3:
-                conditions.append("previous_surgery")
+        conditions = [
+            condition for condition, min_age, probability in CONDITION_GATES
+            if age > min_age and random.random() < probability
+        ]
         
         # Random additional conditions
-        all_conditions = list(self.medical_conditions.keys())
         if random.random() < 0.2:
-            additional = random.choice([c for c in all_conditions if c not in conditions])
-            conditions.append(additional)
+            remaining = self.condition_names.difference(conditions)
+            if remaining:
+                conditions.append(random.choice(sorted(remaining)))
         
         return conditions
     
     def _generate_medications(self, age: int) -> List[str]:
         """Generate realistic medication list"""
-        medications = []
-        
         # Age-based medications
-        if age > 45:
-            if random.random() < 0.4:
-                medications.append("atorvastatin")
-            if random.random() < 0.3:
-                medications.append("lisinopril")
-        
-        if age > 60:
-            if random.random() < 0.2:
-                medications.append("aspirin")
+        medications = [
+            medication for medication, min_age, probability in MEDICATION_GATES
+            if age > min_age and random.random() < probability
+        ]
         
         # Random additional medications
         if random.random() < 0.3:
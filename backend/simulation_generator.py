@@ -1,243 +1,163 @@
+import functools
+import os
 import random
-import json
+import sys
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from types import MappingProxyType
+from typing import Callable, Dict, List, Any, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import orjson
+
+from jit import njit
+from caching import LRUCache
+
+# Procedure catalog, kept as data rather than source literals
+TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'procedure_templates.json')
+
+# Order of the values in the arrays handled by _perturb_vitals
+VITAL_FIELDS = ("heart_rate", "systolic", "diastolic", "oxygen_saturation",
+                "temperature", "respiratory_rate")
+# Where each VITAL_FIELDS entry lives inside a patient's vitals object
+VITAL_PATHS = ("heart_rate", "blood_pressure.systolic", "blood_pressure.diastolic",
+               "oxygen_saturation", "temperature", "respiratory_rate")
+
+# Per-reading offset range for each VITAL_FIELDS entry; integer ranges are inclusive
+VITAL_OFFSET_INTEGER = np.array([True, True, True, True, False, True])
+VITAL_OFFSET_LOW = np.array([-5, -10, -5, -2, -0.5, -2], dtype=np.float64)
+VITAL_OFFSET_HIGH = np.array([10, 5, 5, 1, 0.3, 3], dtype=np.float64) + VITAL_OFFSET_INTEGER
+
+# Difficulty levels a scenario can be generated at, easiest first
+DIFFICULTY_LEVELS = ("beginner", "intermediate", "advanced", "expert")
+
+# Chance that a scenario starts with a complication, by difficulty level
+COMPLICATION_PROBABILITY = {
+    "beginner": 0.3,
+    "intermediate": 0.5,
+    "advanced": 0.7,
+    "expert": 0.8
+}
+
+# Complications a scenario can start with, by procedure type
+PROCEDURE_COMPLICATIONS = {
+    "laparoscopic_cholecystectomy": ("bleeding", "bowel_injury", "equipment_failure")
+}
+DEFAULT_COMPLICATIONS = ("bleeding", "equipment_failure")
+
+# Complications generate_dynamic_complication picks from mid-simulation
+DYNAMIC_COMPLICATIONS = ("unexpected_bleeding", "adhesions", "equipment_malfunction")
+
+# Distinct (procedure, difficulty, objectives) scenario bases kept per generator
+SCENARIO_BASE_CACHE_SIZE = 128
+
+# The explicit signature compiles at import, so the first /vitals request doesn't pay for it
+@njit('void(f8[:], f8[:, :], i8)', cache=True, fastmath=True)
+def _perturb_vitals(baseline, readings, severe_bleeds):
+    """Turn (n, fields) random offsets into vitals readings in place"""
+    readings += baseline
+    readings[:, 0] += 20.0 * severe_bleeds
+    readings[:, 1] -= 15.0 * severe_bleeds
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings, lists into tuples and intern strings"""
+    if isinstance(value, dict):
+        return MappingProxyType({sys.intern(key): _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, str):
+        # Instruments and critical points repeat across steps and procedures
+        return sys.intern(value)
+    return value
+
+def _copy_mutable(value: Any) -> Any:
+    """Copy dicts, read-only mappings and lists all the way down; tuples and scalars are shared"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: _copy_mutable(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_mutable(item) for item in value]
+    return value
+
+def _check_difficulty(difficulty_level: str) -> None:
+    """Reject anything but a DIFFICULTY_LEVELS entry before it reaches a cache key"""
+    if difficulty_level not in DIFFICULTY_LEVELS:
+        raise ValueError(f"Difficulty level {difficulty_level} not supported")
+
+def _clone_steps(base_steps: List[Dict]) -> List[Dict]:
+    """Give each scenario its own steps, down to the hint and focus lists inside them"""
+    return [_copy_mutable(step) for step in base_steps]
+
+@functools.lru_cache(maxsize=256)
+def _parse_duration(duration_str: str) -> Tuple[int, int]:
+    """Parse an "A-B minutes" step duration into (min, max) minutes"""
+    parts = duration_str.replace(" minutes", "").split("-")
+    return int(parts[0]), int(parts[1])
+
+@functools.lru_cache(maxsize=256)
+def _step_haystack(title: str, description: str) -> str:
+    """Lowercased text searched for learning objectives; the NUL keeps matches within one field"""
+    return f"{title}\0{description}".lower()
+
+def _vitals_dicts(readings: np.ndarray) -> List[Dict]:
+    """Convert (n, fields) readings in VITAL_FIELDS order into API vitals dicts"""
+    return [
+        {
+            "heart_rate": int(heart_rate),
+            "blood_pressure": {
+                "systolic": int(systolic),
+                "diastolic": int(diastolic)
+            },
+            "oxygen_saturation": int(oxygen_saturation),
+            "temperature": temperature,
+            "respiratory_rate": int(respiratory_rate)
+        }
+        for heart_rate, systolic, diastolic, oxygen_saturation, temperature, respiratory_rate
+        in readings.tolist()
+    ]
+
+class ComplicationSampler(NamedTuple):
+    """Choices for one complication type, flattened for random.choice()"""
+    severities: Tuple[str, ...]
+    locations: Tuple[str, ...]
+    management: Tuple[str, ...]
 
 class SimulationGenerator:
     def __init__(self):
-        self.procedure_templates = self._load_procedure_templates()
+        # Frozen so steps can share the template's lists instead of copying them
+        self.procedure_templates = _freeze(self._load_procedure_templates())
         self.complication_library = self._load_complications()
+        self._complication_samplers = {
+            name: ComplicationSampler(
+                tuple(data["severity"]), tuple(data["locations"]), tuple(data["management"])
+            )
+            for name, data in self.complication_library.items()
+        }
+        # (procedure_type, difficulty) -> customized steps, shared by every scenario
+        self._variant_cache = {}
+        # (procedure_type, difficulty, objectives) -> scenario without complications
+        self._base_cache = LRUCache(maxsize=SCENARIO_BASE_CACHE_SIZE)
+        self._local = threading.local()
+    
+    @property
+    def _rng(self) -> np.random.Generator:
+        """NumPy generator private to the calling thread"""
+        rng = getattr(self._local, 'rng', None)
+        if rng is None:
+            rng = self._local.rng = np.random.default_rng()
+        return rng
+    
+    @property
+    def _random(self) -> random.Random:
+        """Scalar random generator private to the calling thread"""
+        rand = getattr(self._local, 'random', None)
+        if rand is None:
+            rand = self._local.random = random.Random()
+        return rand
         
     def _load_procedure_templates(self) -> Dict:
         """Load surgical procedure templates"""
-        return {
-            "laparoscopic_cholecystectomy": {
-                "name": "Laparoscopic Cholecystectomy",
-                "category": "General Surgery",
-                "base_duration": 60,
-                "steps": [
-                    {
-                        "step_number": 1,
-                        "title": "Patient Preparation",
-                        "description": "Position patient supine, prep and drape surgical site",
-                        "duration": "10-15 minutes",
-                        "critical_points": [
-                            "Proper patient positioning",
-                            "Sterile field maintenance",
-                            "Antibiotic prophylaxis"
-                        ],
-                        "instruments": ["surgical drapes", "prep solution", "positioning aids"]
-                    },
-                    {
-                        "step_number": 2,
-                        "title": "Trocar Placement", 
-                        "description": "Create pneumoperitoneum and insert trocars",
-                        "duration": "10-15 minutes",
-                        "critical_points": [
-                            "Safe entry technique",
-                            "Proper CO2 insufflation",
-                            "Trocar positioning"
-                        ],
-                        "instruments": ["veress needle", "trocars", "CO2 insufflator"]
-                    },
-                    {
-                        "step_number": 3,
-                        "title": "Diagnostic Laparoscopy",
-                        "description": "Inspect abdominal cavity and identify anatomy",
-                        "duration": "5-10 minutes", 
-                        "critical_points": [
-                            "Systematic inspection",
-                            "Adhesion identification",
-                            "Anatomical orientation"
-                        ],
-                        "instruments": ["laparoscope", "graspers"]
-                    },
-                    {
-                        "step_number": 4,
-                        "title": "Critical View of Safety",
-                        "description": "Achieve critical view of safety before dissection",
-                        "duration": "15-20 minutes",
-                        "critical_points": [
-                            "Clear identification of Calot's triangle",
-                            "Only 2 structures entering gallbladder",
-                            "Clear view of liver bed"
-                        ],
-                        "instruments": ["graspers", "dissector", "clip applier"]
-                    },
-                    {
-                        "step_number": 5,
-                        "title": "Gallbladder Dissection",
-                        "description": "Dissect gallbladder from liver bed",
-                        "duration": "15-25 minutes",
-                        "critical_points": [
-                            "Maintain proper plane",
-                            "Hemostasis control",
-                            "Avoid perforation"
-                        ],
-                        "instruments": ["electrocautery", "graspers", "irrigation"]
-                    },
-                    {
-                        "step_number": 6,
-                        "title": "Specimen Removal",
-                        "description": "Remove gallbladder and close incisions",
-                        "duration": "10-15 minutes",
-                        "critical_points": [
-                            "Secure specimen in bag",
-                            "Inspect for bleeding", 
-                            "Remove CO2"
-                        ],
-                        "instruments": ["specimen bag", "sutures", "local anesthetic"]
-                    }
-                ]
-            },
-            "appendectomy": {
-                "name": "Laparoscopic Appendectomy",
-                "category": "General Surgery",
-                "base_duration": 45,
-                "steps": [
-                    {
-                        "step_number": 1,
-                        "title": "Patient Preparation",
-                        "description": "Position patient and establish pneumoperitoneum",
-                        "duration": "10-15 minutes",
-                        "critical_points": [
-                            "Left lateral tilt positioning",
-                            "Safe trocar insertion",
-                            "Adequate visualization"
-                        ],
-                        "instruments": ["trocars", "CO2 insufflator", "laparoscope"]
-                    },
-                    {
-                        "step_number": 2,
-                        "title": "Appendix Identification",
-                        "description": "Locate and mobilize the appendix",
-                        "duration": "5-10 minutes",
-                        "critical_points": [
-                            "Identify cecum and ileocecal valve",
-                            "Locate appendix base",
-                            "Assess inflammation extent"
-                        ],
-                        "instruments": ["graspers", "atraumatic forceps"]
-                    },
-                    {
-                        "step_number": 3,
-                        "title": "Mesoappendix Division",
-                        "description": "Divide mesoappendix and appendiceal artery",
-                        "duration": "10-15 minutes",
-                        "critical_points": [
-                            "Identify appendiceal artery",
-                            "Sequential clip application",
-                            "Avoid thermal injury"
-                        ],
-                        "instruments": ["clip applier", "electrocautery", "scissors"]
-                    },
-                    {
-                        "step_number": 4,
-                        "title": "Appendix Transection",
-                        "description": "Transect appendix and remove specimen",
-                        "duration": "5-10 minutes",
-                        "critical_points": [
-                            "Secure base with clips",
-                            "Transect between clips",
-                            "Remove specimen safely"
-                        ],
-                        "instruments": ["clip applier", "scissors", "specimen bag"]
-                    },
-                    {
-                        "step_number": 5,
-                        "title": "Closure",
-                        "description": "Close incisions and apply dressings",
-                        "duration": "5-10 minutes",
-                        "critical_points": [
-                            "Inspect for bleeding",
-                            "Close fascial defects",
-                            "Apply sterile dressings"
-                        ],
-                        "instruments": ["sutures", "dressings", "local anesthetic"]
-                    }
-                ]
-            },
-            "knee_arthroscopy": {
-                "name": "Knee Arthroscopy",
-                "category": "Orthopedic",
-                "base_duration": 90,
-                "steps": [
-                    {
-                        "step_number": 1,
-                        "title": "Patient Positioning",
-                        "description": "Position patient supine with knee flexed at 90 degrees",
-                        "duration": "10-15 minutes",
-                        "critical_points": [
-                            "Proper knee positioning",
-                            "Tourniquet application",
-                            "Sterile field preparation"
-                        ],
-                        "instruments": ["positioning aids", "tourniquet", "surgical drapes"]
-                    },
-                    {
-                        "step_number": 2,
-                        "title": "Portal Placement",
-                        "description": "Create anterolateral and anteromedial portals",
-                        "duration": "10-15 minutes",
-                        "critical_points": [
-                            "Proper portal positioning",
-                            "Avoid neurovascular structures",
-                            "Adequate portal spacing"
-                        ],
-                        "instruments": ["scalpel", "arthroscope", "cannulas"]
-                    },
-                    {
-                        "step_number": 3,
-                        "title": "Diagnostic Arthroscopy",
-                        "description": "Systematic examination of knee compartments",
-                        "duration": "15-20 minutes",
-                        "critical_points": [
-                            "Systematic compartment examination",
-                            "Documentation of findings",
-                            "Assessment of pathology"
-                        ],
-                        "instruments": ["arthroscope", "probe", "camera system"]
-                    },
-                    {
-                        "step_number": 4,
-                        "title": "Meniscal Assessment",
-                        "description": "Evaluate meniscal integrity and pathology",
-                        "duration": "20-30 minutes",
-                        "critical_points": [
-                            "Meniscal tear identification",
-                            "Stability assessment",
-                            "Treatment planning"
-                        ],
-                        "instruments": ["probe", "graspers", "meniscal instruments"]
-                    },
-                    {
-                        "step_number": 5,
-                        "title": "Cartilage Evaluation",
-                        "description": "Assess articular cartilage surfaces",
-                        "duration": "15-25 minutes",
-                        "critical_points": [
-                            "Cartilage defect mapping",
-                            "ICRS classification",
-                            "Treatment options"
-                        ],
-                        "instruments": ["probe", "measuring devices", "documentation tools"]
-                    },
-                    {
-                        "step_number": 6,
-                        "title": "Closure and Post-op",
-                        "description": "Close portals and apply dressings",
-                        "duration": "10-15 minutes",
-                        "critical_points": [
-                            "Portal closure",
-                            "Dressing application",
-                            "Post-operative instructions"
-                        ],
-                        "instruments": ["sutures", "dressings", "compression bandage"]
-                    }
-                ]
-            },
-
-        }
+        with open(TEMPLATES_PATH, 'rb') as f:
+            return orjson.loads(f.read())
     
     def _load_complications(self) -> Dict:
         """Load complication scenarios"""
@@ -253,7 +173,8 @@ class SimulationGenerator:
                 "management": ["primary repair", "resection", "conversion"]
             },
             "equipment_failure": {
-                "type": ["CO2 insufflator", "electrocautery", "camera"],
+                "severity": ["minor", "major"],
+                "locations": ["CO2 insufflator", "electrocautery", "camera"],
                 "management": ["backup equipment", "troubleshooting", "conversion"]
             }
         }
@@ -262,16 +183,65 @@ class SimulationGenerator:
                          patient_profile: Dict, learning_objectives: List[str],
                          complications_enabled: bool = True) -> Dict:
         """Generate complete surgical simulation scenario"""
+        if not all(isinstance(objective, str) for objective in learning_objectives):
+            raise ValueError("Learning objectives must be a list of strings")
+        _check_difficulty(difficulty_level)
+        base = self._scenario_base(procedure_type, difficulty_level, tuple(learning_objectives))
         
-        template = self.procedure_templates.get(procedure_type)
-        if not template:
-            raise ValueError(f"Procedure type {procedure_type} not supported")
+        # Only complications and the timestamp differ between calls with the same inputs
+        complications = []
+        if complications_enabled:
+            complications = self._generate_complications(procedure_type, difficulty_level)
         
-        # Customize based on difficulty level
-        steps = self._customize_steps_for_difficulty(template['steps'], difficulty_level)
+        return {
+            **base,
+            "procedure_info": dict(base["procedure_info"]),
+            "steps": _clone_steps(base["steps"]),
+            "complications": complications,
+            "learning_objectives": learning_objectives,
+            "created_at": datetime.now().isoformat()
+        }
+    
+    def _scenario_base(self, procedure_type: str, difficulty_level: str,
+                       learning_objectives: Tuple[str, ...]) -> Dict:
+        """Scenario without complications, shared by every call with the same inputs"""
+        key = (procedure_type, difficulty_level, learning_objectives)
+        base = self._base_cache.get(key)
+        if base is None:
+            template = self.load_template(procedure_type, difficulty_level)
+            base = self.finalize_scenario(
+                template, procedure_type, difficulty_level, None,
+                list(learning_objectives), complications_enabled=False
+            )
+            # Objectives come from clients, so the key space is bounded only by the cache
+            self._base_cache.set(key, base)
+        return base
+    
+    def load_template(self, procedure_type: str, difficulty_level: str) -> Dict:
+        """Load a procedure template with steps customized for the difficulty level"""
+        try:
+            template = self.procedure_templates[procedure_type]
+        except KeyError:
+            raise ValueError(f"Procedure type {procedure_type} not supported") from None
+        _check_difficulty(difficulty_level)
+        
+        # Customize once per known difficulty level; each scenario gets its own step dicts
+        key = (procedure_type, difficulty_level)
+        try:
+            steps = self._variant_cache[key]
+        except KeyError:
+            steps = self._variant_cache.setdefault(
+                key, self._customize_steps_for_difficulty(template['steps'], difficulty_level)
+            )
+        return {**template, "steps": _clone_steps(steps)}
+    
+    def finalize_scenario(self, template: Dict, procedure_type: str, difficulty_level: str,
+                          patient_profile: Dict, learning_objectives: List[str],
+                          complications_enabled: bool = True) -> Dict:
+        """Build the scenario from a loaded template and the patient-specific inputs"""
         
         # Add learning objective focus
-        steps = self._enhance_steps_for_objectives(steps, learning_objectives)
+        steps = self._enhance_steps_for_objectives(template['steps'], learning_objectives)
         
         # Generate potential complications
         complications = []
@@ -295,7 +265,7 @@ class SimulationGenerator:
     
     def _customize_steps_for_difficulty(self, base_steps: List[Dict], difficulty: str) -> List[Dict]:
         """Customize procedural steps based on difficulty level"""
-        steps = json.loads(json.dumps(base_steps))  # Deep copy
+        steps = _clone_steps(base_steps)
         
         for step in steps:
             if difficulty == "beginner":
@@ -339,41 +309,47 @@ class SimulationGenerator:
             }
         ]
     
+    def _add_technique_variations(self, step: Dict) -> List[Dict]:
+        """Add alternative techniques for advanced level"""
+        return [
+            {
+                "technique": f"Alternative approach to {step['title'].lower()}",
+                "indication": "Difficult anatomy or limited exposure",
+                "considerations": ["Additional port or retraction", "Increased operative time"]
+            }
+        ]
+    
     def _generate_complications(self, procedure_type: str, difficulty: str) -> List[Dict]:
         """Generate realistic complications for the procedure"""
         complications = []
         
-        # Determine complication probability based on difficulty
-        prob_map = {
-            "beginner": 0.3,
-            "intermediate": 0.5, 
-            "advanced": 0.7,
-            "expert": 0.8
-        }
+        try:
+            probability = COMPLICATION_PROBABILITY[difficulty]
+        except KeyError:
+            probability = 0.5
         
-        if random.random() < prob_map.get(difficulty, 0.5):
+        rand = self._random
+        if rand.random() < probability:
             # Select appropriate complications for procedure
-            if procedure_type == "laparoscopic_cholecystectomy":
-                possible_complications = ["bleeding", "bowel_injury", "equipment_failure"]
-            else:
-                possible_complications = ["bleeding", "equipment_failure"]
-            
-            selected_complication = random.choice(possible_complications)
-            complication_data = self.complication_library[selected_complication]
+            possible_complications = PROCEDURE_COMPLICATIONS.get(procedure_type, DEFAULT_COMPLICATIONS)
+            selected_complication = rand.choice(possible_complications)
+            sampler = self._complication_samplers[selected_complication]
             
             complications.append({
                 "type": selected_complication,
-                "severity": random.choice(complication_data["severity"]),
-                "location": random.choice(complication_data["locations"]),
-                "trigger_step": random.randint(2, 5),
-                "management_options": complication_data["management"]
+                "severity": rand.choice(sampler.severities),
+                "location": rand.choice(sampler.locations),
+                "trigger_step": rand.randint(2, 5),
+                "management_options": sampler.management
             })
         
         return complications
     
     def get_next_step(self, simulation_data: Dict, current_step: int, assessment: Dict) -> Dict:
         """Get next step in simulation based on current progress"""
-        steps = simulation_data['simulation']['steps']
+        # Stored simulations come back with the scenario merged at the top level
+        simulation = simulation_data.get('simulation', simulation_data)
+        steps = simulation['steps']
         
         if current_step >= len(steps):
             return {"completed": True, "message": "Simulation completed successfully"}
@@ -381,7 +357,7 @@ class SimulationGenerator:
         next_step = steps[current_step]
         
         # Check for triggered complications
-        complications = simulation_data['simulation']['complications']
+        complications = simulation['complications']
         for comp in complications:
             if comp.get('trigger_step') == current_step + 1:
                 next_step['complication'] = comp
@@ -390,34 +366,48 @@ class SimulationGenerator:
     
     def generate_current_vitals(self, patient: Dict, current_step: int, complications: List[Dict]) -> Dict:
         """Generate realistic patient vitals based on current simulation state"""
+        return self.generate_vitals_batch(patient, 1, complications)[0]
+    
+    def generate_vitals_batch(self, patient: Dict, n_steps: int, complications: List[Dict]) -> List[Dict]:
+        """Generate n_steps independent vitals readings from one (n_steps, fields) draw"""
         base_vitals = patient['vitals']
+        return self.generate_vitals_from_baseline([
+            base_vitals['heart_rate'],
+            base_vitals['blood_pressure']['systolic'],
+            base_vitals['blood_pressure']['diastolic'],
+            base_vitals['oxygen_saturation'],
+            base_vitals['temperature'],
+            base_vitals['respiratory_rate']
+        ], n_steps, complications)
+    
+    def generate_vitals_from_baseline(self, baseline: Sequence[float], n_steps: int,
+                                      complications: List[Dict]) -> List[Dict]:
+        """Generate vitals readings from baseline values flattened in VITAL_FIELDS order"""
+        return self.vitals_sampler(baseline, complications)(n_steps)
+    
+    def vitals_sampler(self, baseline: Sequence[float],
+                       complications: List[Dict]) -> Callable[[int], List[Dict]]:
+        """Bind a baseline and its complications into a function returning n vitals readings"""
+        baseline = np.asarray(baseline, dtype=np.float64)
+        severe_bleeds = sum(
+            1 for comp in complications
+            if comp['type'] == 'bleeding' and comp['severity'] == 'severe'
+        )
         
-        # Modify vitals based on procedure progress and complications
-        current_vitals = {
-            "heart_rate": base_vitals['heart_rate'] + random.randint(-5, 10),
-            "blood_pressure": {
-                "systolic": base_vitals['blood_pressure']['systolic'] + random.randint(-10, 5),
-                "diastolic": base_vitals['blood_pressure']['diastolic'] + random.randint(-5, 5)
-            },
-            "oxygen_saturation": base_vitals['oxygen_saturation'] + random.randint(-2, 1),
-            "temperature": base_vitals['temperature'] + random.uniform(-0.5, 0.3),
-            "respiratory_rate": base_vitals['respiratory_rate'] + random.randint(-2, 3)
-        }
-        
-        # Apply complication effects
-        for comp in complications:
-            if comp['type'] == 'bleeding' and comp['severity'] == 'severe':
-                current_vitals['heart_rate'] += 20
-                current_vitals['blood_pressure']['systolic'] -= 15
+        def sample(n_steps: int) -> List[Dict]:
+            # Modify vitals based on procedure progress and complications
+            readings = self._rng.uniform(VITAL_OFFSET_LOW, VITAL_OFFSET_HIGH, (n_steps, len(VITAL_FIELDS)))
+            readings[:, VITAL_OFFSET_INTEGER] = np.floor(readings[:, VITAL_OFFSET_INTEGER])
+            _perturb_vitals(baseline, readings, severe_bleeds)
+            return _vitals_dicts(readings)
         
-        return current_vitals
+        return sample
     
     def generate_dynamic_complication(self, simulation_data: Dict, current_step: int) -> Dict:
         """Generate a dynamic complication during simulation"""
         procedure_type = simulation_data['simulation']['procedure_info']['name']
         
-        complications = ["unexpected_bleeding", "adhesions", "equipment_malfunction"]
-        selected = random.choice(complications)
+        selected = self._random.choice(DYNAMIC_COMPLICATIONS)
         
         complication_scenarios = {
             "unexpected_bleeding": {
@@ -446,36 +436,25 @@ class SimulationGenerator:
     
     def _extend_duration(self, duration_str: str, factor: float) -> str:
         """Extend duration by factor"""
-        # Parse duration string like "10-15 minutes"
-        parts = duration_str.replace(" minutes", "").split("-")
-        min_time = int(parts[0]) * factor
-        max_time = int(parts[1]) * factor
-        return f"{int(min_time)}-{int(max_time)} minutes"
+        min_time, max_time = _parse_duration(duration_str)
+        return f"{int(min_time * factor)}-{int(max_time * factor)} minutes"
     
     def _reduce_duration(self, duration_str: str, factor: float) -> str:
         """Reduce duration by factor"""
-        parts = duration_str.replace(" minutes", "").split("-")
-        min_time = int(parts[0]) * factor
-        max_time = int(parts[1]) * factor
-        return f"{int(min_time)}-{int(max_time)} minutes"
+        min_time, max_time = _parse_duration(duration_str)
+        return f"{int(min_time * factor)}-{int(max_time * factor)} minutes"
     
     def _calculate_duration(self, steps: List[Dict], difficulty: str) -> int:
         """Calculate total estimated duration"""
-        total = 0
-        for step in steps:
-            duration_str = step['duration']
-            avg = sum([int(x) for x in duration_str.replace(" minutes", "").split("-")]) / 2
-            total += avg
-        
-        return int(total)
+        return int(sum(sum(_parse_duration(step['duration'])) / 2 for step in steps))
     
     def _enhance_steps_for_objectives(self, steps: List[Dict], objectives: List[str]) -> List[Dict]:
         """Enhance steps to focus on learning objectives"""
+        needles = [(objective, objective.lower()) for objective in objectives]
         for step in steps:
-            step["learning_focus"] = []
-            for objective in objectives:
-                if objective.lower() in step['title'].lower() or objective.lower() in step['description'].lower():
-                    step["learning_focus"].append(objective)
-                    step["assessment_weight"] = 2.0  # Higher weight for objective-focused steps
+            haystack = _step_haystack(step['title'], step['description'])
+            step["learning_focus"] = [objective for objective, needle in needles if needle in haystack]
+            if step["learning_focus"]:
+                step["assessment_weight"] = 2.0  # Higher weight for objective-focused steps
         
         return steps
\ No newline at end of file
@@ -0,0 +1,35 @@
+import pytest
+
+from database_manager import DatabaseManager
+
+class _SavepointConnection:
+    """Connection proxy whose commits stay inside the enclosing test savepoint"""
+    def __init__(self, conn: object):
+        self._conn = conn
+    
+    def commit(self):
+        pass
+    
+    def rollback(self):
+        self._conn.execute('ROLLBACK TO test')
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+@pytest.fixture(scope="session")
+def _db():
+    # The constructor builds the schema; a single pooled connection means
+    # every manager call runs on the connection the test savepoint is on,
+    # and keeps the in-memory database alive for the whole session
+    return DatabaseManager(":memory:", pool_size=1)
+
+@pytest.fixture
+def db_session(_db):
+    conn = _db.get_connection()
+    conn.execute('SAVEPOINT test')
+    _db.release_connection(_SavepointConnection(conn))
+    yield _db
+    _db.get_connection()
+    conn.execute('ROLLBACK TO test')
+    conn.execute('RELEASE test')
+    _db.release_connection(conn)
@@ -1,21 +1,37 @@
 #!/usr/bin/env python3
 
 import requests
+from requests.adapters import HTTPAdapter
 import sys
 import logging
+from logging.handlers import MemoryHandler, RotatingFileHandler
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
 
 # Configure logging
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# The file isn't opened until the buffered records are flushed, in one batch
+# at exit or at the first error
+_file_handler = RotatingFileHandler('logs/health_check.log', maxBytes=1 << 20,
+                                    backupCount=3, delay=True)
+_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler('logs/health_check.log'),
+        MemoryHandler(capacity=32, flushLevel=logging.ERROR, target=_file_handler),
         logging.StreamHandler()
     ]
 )
 
+# One keep-alive connection pool shared by every probe in this run
+_session = requests.Session()
+_session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
 def check_health():
     """Check the health of the surgical simulation platform"""
     try:
@@ -23,7 +39,7 @@ def check_health():
         base_url = os.environ.get('HEALTH_CHECK_URL', 'http://localhost:5000')
         
         # Check health endpoint
-        response = requests.get(f'{base_url}/health', timeout=10)
+        response = _session.get(f'{base_url}/health', timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -53,7 +69,7 @@ def check_api_endpoints():
         base_url = os.environ.get('HEALTH_CHECK_URL', 'http://localhost:5000')
         
         # Test procedures endpoint
-        response = requests.get(f'{base_url}/api/procedures', timeout=5)
+        response = _session.get(f'{base_url}/api/procedures', timeout=5)
         if response.status_code == 200:
             logging.info("✅ API endpoints are responding")
             return True
@@ -69,11 +85,11 @@ def main():
     """Main health check function"""
     logging.info("Starting health check...")
     
-    # Check application health
-    app_healthy = check_health()
-    
-    # Check API endpoints
-    api_healthy = check_api_endpoints()
+    # The probes are independent, so a slow one doesn't delay the other
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        health = executor.submit(check_health)
+        api = executor.submit(check_api_endpoints)
+        app_healthy, api_healthy = health.result(), api.result()
     
     # Overall health status
     overall_healthy = app_healthy and api_healthy
@@ -0,0 +1,29 @@
+import pytest
+
+from simulation_generator import SimulationGenerator
+from patient_generator import PatientGenerator
+
+# Generators hold only read-only templates and per-thread RNGs, so one
+# instance each serves the whole test session
+
+@pytest.fixture(scope="session")
+def sim_gen():
+    return SimulationGenerator()
+
+@pytest.fixture(scope="session")
+def patient_gen():
+    return PatientGenerator()
+
+@pytest.fixture(scope="session")
+def sample_patient(patient_gen):
+    return patient_gen.generate_patient()
+
+@pytest.fixture(scope="session")
+def lap_chole_scenario(sim_gen, sample_patient):
+    # Shared read-only; tests that change a scenario generate their own
+    return sim_gen.generate_scenario(
+        procedure_type="laparoscopic_cholecystectomy",
+        difficulty_level="beginner",
+        patient_profile=sample_patient,
+        learning_objectives=[]
+    )
@@ -1,9 +1,18 @@
 import pytest
-import json
-from backend.app import app
 
-@pytest.fixture
-def client():
+# Every endpoint here reads or writes the app's SQLite database
+pytestmark = pytest.mark.db
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    # The app opens its database and cache at import, so point both at a
+    # scratch directory instead of the tracked surgical_simulations.db
+    scratch = tmp_path_factory.mktemp("app")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('SIMULATION_DB_PATH', str(scratch / 'test.db'))
+        mp.setenv('SIMULATION_CACHE_DIR', str(scratch / 'cache'))
+        # Imported here so collecting the suite does not load Flask and the backend
+        from backend.app import app
     app.config['TESTING'] = True
     with app.test_client() as client:
         yield client
@@ -11,9 +20,15 @@ def client():
 def test_procedures_endpoint(client):
     response = client.get('/api/procedures')
     assert response.status_code == 200
-    data = json.loads(response.data)
+    data = response.get_json()
     assert isinstance(data, list)
 
+def test_procedures_not_modified(client):
+    etag = client.get('/api/procedures').headers['ETag']
+    response = client.get('/api/procedures', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
 def test_generate_simulation(client):
     config = {
         "procedure_type": "laparoscopic_cholecystectomy",
@@ -24,9 +39,109 @@ def test_generate_simulation(client):
         "complications_enabled": True
     }
     
-    response = client.post('/api/generate-simulation', 
-                          data=json.dumps(config),
-                          content_type='application/json')
+    response = client.post('/api/generate-simulation', json=config)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['status'] == 'success'
+
+@pytest.mark.parametrize("difficulty", ["novice", None])
+def test_generate_simulation_rejects_unknown_difficulty(client, difficulty):
+    config = {
+        "procedure_type": "laparoscopic_cholecystectomy",
+        "difficulty_level": difficulty
+    }
+    
+    response = client.post('/api/generate-simulation', json=config)
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+def test_identical_configs_get_fresh_patients(client):
+    config = {
+        "procedure_type": "appendectomy",
+        "difficulty_level": "intermediate",
+        "age_range": [40, 50],
+        "gender": "male",
+        "complications_enabled": False
+    }
+    
+    first = client.post('/api/generate-simulation', json=config).get_json()
+    second = client.post('/api/generate-simulation', json=config).get_json()
+    assert first['patient'] != second['patient']
+    assert first['simulation_id'] != second['simulation_id']
+
+def test_simulation_revalidates_with_etag(client):
+    config = {
+        "procedure_type": "appendectomy",
+        "difficulty_level": "beginner",
+        "complications_enabled": False
+    }
+    
+    created = client.post('/api/generate-simulation', json=config).get_json()
+    response = client.get(f"/api/simulation/{created['simulation_id']}")
     assert response.status_code == 200
-    data = json.loads(response.data)
-    assert data['status'] == 'success'
\ No newline at end of file
+    assert response.headers['Cache-Control'] == 'no-cache'
+    
+    response = client.get(f"/api/simulation/{created['simulation_id']}",
+                          headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+
+def test_steps_are_shared_with_other_workers(client):
+    import backend.app
+    from database_manager import DatabaseManager
+    # A second manager on the same file stands in for another worker process
+    other_worker = DatabaseManager(backend.app.db_manager.db_path, pool_size=1)
+    config = {
+        "procedure_type": "appendectomy",
+        "difficulty_level": "beginner",
+        "complications_enabled": False
+    }
+    
+    simulation_id = client.post('/api/generate-simulation', json=config).get_json()['simulation_id']
+    step = client.post(f"/api/simulation/{simulation_id}/step", json={
+        "step_number": 1,
+        "actions": [{"type": "incision", "accuracy": 0.8}],
+        "time_taken": 60
+    })
+    assert step.status_code == 200
+    assert [row[0] for row in other_worker.get_step_scores(simulation_id)] == [1]
+    
+    # A step saved by the other worker is in this worker's final assessment
+    assert other_worker.update_simulation_progress(
+        simulation_id, 2, step.get_json()['assessment'], []
+    )
+    response = client.post(f"/api/simulation/{simulation_id}/complete")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data['simulation_summary']['step_assessments']) == 2
+    assert 'error' not in data['final_assessment']
+    
+    response = client.get(f"/api/simulation/{simulation_id}")
+    assert response.headers['Cache-Control'] == 'private, max-age=31536000, immutable'
+
+def test_read_overtaken_by_write_is_not_cached(client, monkeypatch):
+    import backend.app
+    config = {
+        "procedure_type": "appendectomy",
+        "difficulty_level": "beginner",
+        "complications_enabled": False
+    }
+    simulation_id = client.post('/api/generate-simulation', json=config).get_json()['simulation_id']
+    
+    read = backend.app.db_manager.get_simulation
+    def read_then_write(simulation_id):
+        simulation_data = read(simulation_id)
+        # Another request writes to the simulation before this read is cached
+        backend.app._invalidate_simulation(simulation_id)
+        return simulation_data
+    
+    monkeypatch.setattr(backend.app.db_manager, 'get_simulation', read_then_write)
+    assert backend.app._get_simulation(simulation_id) is not None
+    assert backend.app.simulation_cache.get(simulation_id) is None
+    
+    monkeypatch.setattr(backend.app.db_manager, 'get_simulation', read)
+    assert backend.app._get_simulation(simulation_id) is not None
+    assert backend.app.simulation_cache.get(simulation_id) is not None
+
+def test_vitals_for_unknown_simulation(client):
+    response = client.get('/api/simulation/does-not-exist/vitals')
+    assert response.status_code == 404
\ No newline at end of file
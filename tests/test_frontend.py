@@ -1,45 +1,95 @@
+import socket
+
 import pytest
-from selenium import webdriver
+
+pytest.importorskip("selenium")
+
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-import time
 
+BASE_URL = "http://localhost:5000"
+SERVER_ADDRESS = ("localhost", 5000)
+WINDOW_SIZE = (1920, 1080)
+IMPLICIT_WAIT = 2
+
+# Visibility of each selector, answered in a single WebDriver round trip
+DISPLAYED_SCRIPT = """
+return arguments[0].map(function (selector) {
+    var el = document.querySelector(selector);
+    return !!el && el.getClientRects().length > 0 &&
+        getComputedStyle(el).visibility !== 'hidden';
+});
+"""
+
+@pytest.mark.frontend
 class TestFrontend:
-    def setup_method(self):
-        """Setup Chrome driver for testing"""
+    @pytest.fixture(scope="class", autouse=True)
+    def driver(self, request):
+        """Share one headless Chrome driver across the class"""
+        # Without a server every lookup would sit out the implicit wait
+        try:
+            socket.create_connection(SERVER_ADDRESS, timeout=0.5).close()
+        except OSError:
+            pytest.skip(f"backend not running at {BASE_URL}")
+        
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
         chrome_options = Options()
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.driver.implicitly_wait(10)
-        self.base_url = "http://localhost:5000"
+        driver = webdriver.Chrome(options=chrome_options)
+        driver.implicitly_wait(IMPLICIT_WAIT)
+        driver.set_window_size(*WINDOW_SIZE)
+        request.cls.driver = driver
+        request.cls.base_url = BASE_URL
+        yield driver
+        driver.quit()
+    
+    def open(self, path: str = ""):
+        """Navigate to path unless the shared driver is already showing it"""
+        url = f"{self.base_url}{path}"
+        if self.driver.current_url.rstrip("/") != url.rstrip("/"):
+            self.driver.get(url)
+    
+    def resize(self, width: int, height: int):
+        """Resize the window and wait until the viewport has reflowed to the new width"""
+        self.driver.set_window_size(width, height)
+        WebDriverWait(self.driver, 3).until(
+            lambda d: d.execute_script("return window.innerWidth") == width
+        )
     
-    def teardown_method(self):
-        """Clean up driver after each test"""
-        if self.driver:
-            self.driver.quit()
+    def displayed(self, *selectors: str) -> dict:
+        """Map each CSS selector to whether its element is shown, waiting as find_element would"""
+        shown = {}
+        
+        def all_shown(driver):
+            shown.update(zip(selectors, driver.execute_script(DISPLAYED_SCRIPT, list(selectors))))
+            return all(shown.values())
+        
+        try:
+            WebDriverWait(self.driver, IMPLICIT_WAIT).until(all_shown)
+        except TimeoutException:
+            pass
+        return shown
     
     def test_dashboard_loads(self):
         """Test that the main dashboard loads correctly"""
-        self.driver.get(self.base_url)
+        self.open()
         
         # Check if main elements are present
         assert "Surgical Simulation Platform" in self.driver.title
         
-        # Check for dashboard elements
-        dashboard = self.driver.find_element(By.ID, "dashboard")
-        assert dashboard.is_displayed()
-        
-        # Check for navigation elements
-        nav = self.driver.find_element(By.CLASS_NAME, "navbar")
-        assert nav.is_displayed()
+        # Check for dashboard and navigation elements
+        shown = self.displayed("#dashboard", ".navbar")
+        assert all(shown.values()), shown
     
     def test_procedure_selection(self):
         """Test procedure selection functionality"""
-        self.driver.get(self.base_url)
+        self.open()
         
         # Find and click on a procedure card
         procedure_cards = self.driver.find_elements(By.CLASS_NAME, "procedure-card")
@@ -55,47 +105,31 @@ class TestFrontend:
     
     def test_simulation_interface(self):
         """Test simulation interface elements"""
-        self.driver.get(f"{self.base_url}/simulation")
-        
-        # Check for simulation container
-        sim_container = self.driver.find_element(By.CLASS_NAME, "simulation-container")
-        assert sim_container.is_displayed()
-        
-        # Check for sidebar
-        sidebar = self.driver.find_element(By.CLASS_NAME, "simulation-sidebar")
-        assert sidebar.is_displayed()
+        self.open("/simulation")
         
-        # Check for viewport
-        viewport = self.driver.find_element(By.CLASS_NAME, "simulation-viewport")
-        assert viewport.is_displayed()
+        # Check for simulation container, sidebar and viewport
+        shown = self.displayed(".simulation-container", ".simulation-sidebar", ".simulation-viewport")
+        assert all(shown.values()), shown
     
     def test_patient_information_display(self):
         """Test patient information display in simulation"""
-        self.driver.get(f"{self.base_url}/simulation")
+        self.open("/simulation")
         
-        # Check for patient panel
-        patient_panel = self.driver.find_element(By.CLASS_NAME, "patient-panel")
-        assert patient_panel.is_displayed()
-        
-        # Check for patient vitals
-        vitals_grid = self.driver.find_element(By.CLASS_NAME, "vitals-grid")
-        assert vitals_grid.is_displayed()
+        # Check for patient panel and vitals
+        shown = self.displayed(".patient-panel", ".vitals-grid")
+        assert all(shown.values()), shown
     
     def test_procedure_steps_navigation(self):
         """Test procedure steps navigation"""
-        self.driver.get(f"{self.base_url}/simulation")
-        
-        # Check for steps panel
-        steps_panel = self.driver.find_element(By.CLASS_NAME, "steps-panel")
-        assert steps_panel.is_displayed()
+        self.open("/simulation")
         
-        # Check for step list
-        step_list = self.driver.find_element(By.CLASS_NAME, "step-list")
-        assert step_list.is_displayed()
+        # Check for steps panel and step list
+        shown = self.displayed(".steps-panel", ".step-list")
+        assert all(shown.values()), shown
     
     def test_control_buttons(self):
         """Test simulation control buttons"""
-        self.driver.get(f"{self.base_url}/simulation")
+        self.open("/simulation")
         
         # Check for control buttons
         control_buttons = self.driver.find_elements(By.CLASS_NAME, "control-button")
@@ -107,7 +141,7 @@ class TestFrontend:
     
     def test_tool_selection(self):
         """Test surgical tool selection"""
-        self.driver.get(f"{self.base_url}/simulation")
+        self.open("/simulation")
         
         # Check for tool panel
         tool_panel = self.driver.find_element(By.CLASS_NAME, "tool-panel")
@@ -119,27 +153,28 @@ class TestFrontend:
     
     def test_responsive_design(self):
         """Test responsive design on different screen sizes"""
-        self.driver.get(self.base_url)
+        self.open()
         
         # Test mobile viewport
-        self.driver.set_window_size(375, 667)  # iPhone SE size
-        time.sleep(2)
+        self.resize(375, 667)  # iPhone SE size
         
         # Check if elements are still accessible
         dashboard = self.driver.find_element(By.ID, "dashboard")
         assert dashboard.is_displayed()
         
         # Test tablet viewport
-        self.driver.set_window_size(768, 1024)  # iPad size
-        time.sleep(2)
+        self.resize(768, 1024)  # iPad size
         
         # Check if elements are still accessible
         dashboard = self.driver.find_element(By.ID, "dashboard")
         assert dashboard.is_displayed()
+        
+        # The driver is shared, so leave the window as the next test expects it
+        self.resize(*WINDOW_SIZE)
     
     def test_navigation_links(self):
         """Test navigation between pages"""
-        self.driver.get(self.base_url)
+        self.open()
         
         # Test navigation to simulation page
         sim_link = self.driver.find_element(By.CSS_SELECTOR, "a[href='/simulation']")
@@ -167,22 +202,19 @@ class TestFrontend:
     
     def test_performance_metrics_display(self):
         """Test performance metrics display on dashboard"""
-        self.driver.get(self.base_url)
+        self.open()
         
         # Check for performance metrics
         metrics_elements = self.driver.find_elements(By.CLASS_NAME, "metric-card")
         assert len(metrics_elements) > 0
         
         # Check for specific metrics
-        avg_score = self.driver.find_element(By.ID, "avg-score")
-        assert avg_score.is_displayed()
-        
-        completed_sims = self.driver.find_element(By.ID, "completed-sims")
-        assert completed_sims.is_displayed()
+        shown = self.displayed("#avg-score", "#completed-sims")
+        assert all(shown.values()), shown
     
     def test_recent_activity_display(self):
         """Test recent activity display on dashboard"""
-        self.driver.get(self.base_url)
+        self.open()
         
         # Check for recent activity section
         recent_activity = self.driver.find_element(By.ID, "recent-simulations")
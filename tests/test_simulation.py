@@ -1,26 +1,9 @@
 import pytest
-import sys
-import os
-
-# Add the backend directory to the Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
-
-from simulation_generator import SimulationGenerator
-from patient_generator import PatientGenerator
 
 class TestSimulationGenerator:
-    def setup_method(self):
-        self.sim_gen = SimulationGenerator()
-        self.patient_gen = PatientGenerator()
-    
-    def test_generate_scenario_basic(self):
+    def test_generate_scenario_basic(self, lap_chole_scenario):
         """Test basic scenario generation"""
-        patient = self.patient_gen.generate_patient()
-        scenario = self.sim_gen.generate_scenario(
-            procedure_type="laparoscopic_cholecystectomy",
-            difficulty_level="beginner",
-            patient_profile=patient
-        )
+        scenario = lap_chole_scenario
         
         assert scenario is not None
         assert "steps" in scenario
@@ -29,13 +12,12 @@ class TestSimulationGenerator:
         assert scenario["procedure_type"] == "laparoscopic_cholecystectomy"
         assert scenario["difficulty_level"] == "beginner"
     
-    def test_generate_scenario_with_complications(self):
+    def test_generate_scenario_with_complications(self, sim_gen, sample_patient):
         """Test scenario generation with complications enabled"""
-        patient = self.patient_gen.generate_patient()
-        scenario = self.sim_gen.generate_scenario(
+        scenario = sim_gen.generate_scenario(
             procedure_type="appendectomy",
             difficulty_level="intermediate",
-            patient_profile=patient,
+            patient_profile=sample_patient,
             complications_enabled=True
         )
         
@@ -43,47 +25,60 @@ class TestSimulationGenerator:
         assert "complications" in scenario
         assert isinstance(scenario["complications"], list)
     
-    def test_get_next_step(self):
+    def test_cached_difficulty_variants_are_not_shared(self, sim_gen, sample_patient):
+        """Test objective focus from one scenario does not leak into the next"""
+        focused = sim_gen.generate_scenario(
+            "appendectomy", "advanced", sample_patient, ["appendix"], complications_enabled=False
+        )
+        plain = sim_gen.generate_scenario(
+            "appendectomy", "advanced", sample_patient, [], complications_enabled=False
+        )
+        
+        assert any(step["learning_focus"] for step in focused["steps"])
+        assert not any(step["learning_focus"] for step in plain["steps"])
+        assert all("variations" in step for step in plain["steps"])
+    
+    def test_cached_scenario_lists_are_not_shared(self, sim_gen, sample_patient):
+        """Test nested step lists from a cached scenario base belong to each scenario"""
+        first = sim_gen.generate_scenario("appendectomy", "beginner", sample_patient, ["appendix"])
+        second = sim_gen.generate_scenario("appendectomy", "beginner", sample_patient, ["appendix"])
+        
+        first["steps"][0]["hints"].append("extra hint")
+        first["steps"][0]["learning_focus"].append("extra focus")
+        assert "extra hint" not in second["steps"][0]["hints"]
+        assert "extra focus" not in second["steps"][0]["learning_focus"]
+    
+    def test_non_string_learning_objectives(self, sim_gen, sample_patient):
+        """Test nested learning objectives are rejected instead of failing to hash"""
+        with pytest.raises(ValueError):
+            sim_gen.generate_scenario("appendectomy", "beginner", sample_patient, [["appendix"]])
+    
+    def test_get_next_step(self, sim_gen, sample_patient):
         """Test getting next step in simulation"""
-        patient = self.patient_gen.generate_patient()
-        scenario = self.sim_gen.generate_scenario(
+        scenario = sim_gen.generate_scenario(
             procedure_type="knee_arthroscopy",
             difficulty_level="advanced",
-            patient_profile=patient
+            patient_profile=sample_patient
         )
         
         # Test first step
-        next_step = self.sim_gen.get_next_step(scenario, 0, {"score": 85})
+        next_step = sim_gen.get_next_step(scenario, 0, {"score": 85})
         assert next_step is not None
         assert "instructions" in next_step
         assert "expected_actions" in next_step
     
-    def test_generate_dynamic_complication(self):
+    def test_generate_dynamic_complication(self, sim_gen, lap_chole_scenario):
         """Test dynamic complication generation"""
-        patient = self.patient_gen.generate_patient()
-        scenario = self.sim_gen.generate_scenario(
-            procedure_type="laparoscopic_cholecystectomy",
-            difficulty_level="intermediate",
-            patient_profile=patient
-        )
-        
-        complication = self.sim_gen.generate_dynamic_complication(scenario, 2)
+        complication = sim_gen.generate_dynamic_complication(lap_chole_scenario, 2)
         assert complication is not None
         assert "type" in complication
         assert "description" in complication
         assert "severity" in complication
     
-    def test_generate_current_vitals(self):
+    def test_generate_current_vitals(self, sim_gen, sample_patient):
         """Test current vitals generation"""
-        patient = self.patient_gen.generate_patient()
-        scenario = self.sim_gen.generate_scenario(
-            procedure_type="appendectomy",
-            difficulty_level="beginner",
-            patient_profile=patient
-        )
-        
-        vitals = self.sim_gen.generate_current_vitals(
-            patient, 
+        vitals = sim_gen.generate_current_vitals(
+            sample_patient, 
             current_step=1, 
             complications=[]
         )
@@ -94,35 +89,43 @@ class TestSimulationGenerator:
         assert "temperature" in vitals
         assert "oxygen_saturation" in vitals
     
-    def test_invalid_procedure_type(self):
-        """Test handling of invalid procedure type"""
-        patient = self.patient_gen.generate_patient()
+    def test_generate_vitals_batch(self, sim_gen, sample_patient):
+        """Test batch vitals stay within the per-reading offset ranges"""
+        readings = sim_gen.generate_vitals_batch(sample_patient, 50, complications=[])
         
+        assert len(readings) == 50
+        baseline = sample_patient["vitals"]["heart_rate"]
+        assert all(-5 <= vitals["heart_rate"] - baseline <= 10 for vitals in readings)
+        assert all(isinstance(vitals["heart_rate"], int) for vitals in readings)
+    
+    def test_invalid_procedure_type(self, sim_gen, sample_patient):
+        """Test handling of invalid procedure type"""
         with pytest.raises(ValueError):
-            self.sim_gen.generate_scenario(
+            sim_gen.generate_scenario(
                 procedure_type="invalid_procedure",
                 difficulty_level="beginner",
-                patient_profile=patient
+                patient_profile=sample_patient
             )
     
-    def test_invalid_difficulty_level(self):
+    def test_invalid_difficulty_level(self, sim_gen, sample_patient):
         """Test handling of invalid difficulty level"""
-        patient = self.patient_gen.generate_patient()
-        
         with pytest.raises(ValueError):
-            self.sim_gen.generate_scenario(
+            sim_gen.generate_scenario(
                 procedure_type="laparoscopic_cholecystectomy",
                 difficulty_level="expert",
-                patient_profile=patient
+                patient_profile=sample_patient
             )
+    
+    def test_unknown_difficulty_level_is_not_cached(self, sim_gen):
+        """Test that an unknown difficulty level is rejected before it is cached"""
+        with pytest.raises(ValueError):
+            sim_gen.load_template("laparoscopic_cholecystectomy", "novice")
+        assert ("laparoscopic_cholecystectomy", "novice") not in sim_gen._variant_cache
 
 class TestPatientGenerator:
-    def setup_method(self):
-        self.patient_gen = PatientGenerator()
-    
-    def test_generate_patient_basic(self):
+    def test_generate_patient_basic(self, sample_patient):
         """Test basic patient generation"""
-        patient = self.patient_gen.generate_patient()
+        patient = sample_patient
         
         assert patient is not None
         assert "age" in patient
@@ -132,33 +135,33 @@ class TestPatientGenerator:
         assert 18 <= patient["age"] <= 100
         assert patient["gender"] in ["male", "female"]
     
-    def test_generate_patient_with_age_range(self):
-        """Test patient generation with specific age range"""
-        patient = self.patient_gen.generate_patient(age_range=[30, 50])
-        
-        assert 30 <= patient["age"] <= 50
-    
-    def test_generate_patient_with_gender(self):
-        """Test patient generation with specific gender"""
-        patient = self.patient_gen.generate_patient(gender="female")
-        
-        assert patient["gender"] == "female"
-    
-    def test_generate_patient_with_medical_history(self):
-        """Test patient generation with medical history"""
-        medical_history = ["diabetes", "hypertension"]
-        patient = self.patient_gen.generate_patient(medical_history=medical_history)
-        
-        assert "diabetes" in patient["medical_history"]
-        assert "hypertension" in patient["medical_history"]
+    @pytest.mark.parametrize("kwargs,check", [
+        ({"age_range": [30, 50]}, lambda p: 30 <= p["age"] <= 50),
+        ({"gender": "female"}, lambda p: p["gender"] == "female"),
+        ({"medical_history": ["diabetes", "hypertension"]},
+         lambda p: {"diabetes", "hypertension"} <= set(p["medical_history"])),
+    ], ids=["age_range", "gender", "medical_history"])
+    def test_generate_patient_with_options(self, patient_gen, kwargs, check):
+        """Test patient generation honours each requested option"""
+        assert check(patient_gen.generate_patient(**kwargs))
     
-    def test_patient_vitals_consistency(self):
+    def test_patient_vitals_consistency(self, sample_patient):
         """Test that patient vitals are within reasonable ranges"""
-        patient = self.patient_gen.generate_patient()
-        vitals = patient["vitals"]
+        vitals = sample_patient["vitals"]
         
         assert 60 <= vitals["heart_rate"] <= 120
         assert 90 <= vitals["systolic_bp"] <= 180
         assert 60 <= vitals["diastolic_bp"] <= 110
         assert 36.5 <= vitals["temperature"] <= 38.5
         assert 95 <= vitals["oxygen_saturation"] <= 100
+    
+    def test_generate_patients_batch(self, patient_gen):
+        """Test vectorized batch patient generation"""
+        patients = patient_gen.generate_patients(50, age_range=(30, 50), gender="female")
+        
+        assert len(patients) == 50
+        for patient in patients:
+            assert 30 <= patient["demographics"]["age"] <= 50
+            assert patient["demographics"]["gender"] == "female"
+            assert isinstance(patient["vitals"]["heart_rate"], int)
+            assert 95 <= patient["vitals"]["oxygen_saturation"] <= 100